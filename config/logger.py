@@ -45,32 +45,19 @@ class Logger:
         """设置日志记录器的名称"""
         pass  # loguru自动处理
 
-    @staticmethod
-    def debug(msg: str, *args, **kwargs):
-        """记录debug级别日志"""
-        logger.debug(msg, *args, **kwargs)
-
-    @staticmethod
-    def info(msg: str, *args, **kwargs):
-        """记录info级别日志"""
-        logger.info(msg, *args, **kwargs)
-
-    @staticmethod
-    def warning(msg: str, *args, **kwargs):
-        """记录warning级别日志"""
-        logger.warning(msg, *args, **kwargs)
-
-    @staticmethod
-    def error(msg: str, *args, **kwargs):
-        """记录error级别日志"""
-        logger.error(msg, *args, **kwargs)
-
-    @staticmethod
-    def exception(msg: str, *args, **kwargs):
-        """记录exception级别日志"""
-        logger.exception(msg, *args, **kwargs)
-
-    @staticmethod
-    def critical(msg: str, *args, **kwargs):
-        """记录critical级别日志"""
-        logger.critical(msg, *args, **kwargs)
+    # 直接绑定loguru的方法, 省去一层函数调用, 日志中记录的也是真实的调用位置
+    debug = logger.debug
+    info = logger.info
+    warning = logger.warning
+    error = logger.error
+    exception = logger.exception
+    critical = logger.critical
+
+
+# 模块级别名, 热点循环中可 ``from config.logger import debug`` 后直接调用
+debug = logger.debug
+info = logger.info
+warning = logger.warning
+error = logger.error
+exception = logger.exception
+critical = logger.critical
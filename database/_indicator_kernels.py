@@ -0,0 +1,283 @@
+"""技术指标的Numba加速内核
+
+滚动窗口内核与 pandas ``rolling(window=p)`` 的默认行为保持一致:
+窗口内存在 NaN 或数据不足 p 个时输出 NaN。
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def _rolling_mean(a, p):
+    """滑动窗口均值, 维护窗口内的累加和"""
+    n = a.size
+    out = np.full(n, np.nan)
+    total = 0.0
+    nobs = 0
+
+    for i in range(n):
+        x = a[i]
+        if x == x:
+            total += x
+            nobs += 1
+        if i >= p:
+            y = a[i - p]
+            if y == y:
+                total -= y
+                nobs -= 1
+                if nobs == 0:
+                    total = 0.0
+        if nobs >= p:
+            out[i] = total / p
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _welford_step(a, i, p, nobs, mean, m2, same_run):
+    """
+    滑动窗口Welford更新: 加入a[i]并移出a[i-p]
+
+    Returns:
+        (nobs, mean, m2, same_run, std), 窗口不满或含NaN时std为NaN
+    """
+    x = a[i]
+    if x == x:
+        nobs += 1
+        delta = x - mean
+        mean += delta / nobs
+        m2 += delta * (x - mean)
+        # 连续相同值的个数, 窗口内全部相同时标准差精确为0
+        if i > 0 and x == a[i - 1]:
+            same_run += 1
+        else:
+            same_run = 1
+    else:
+        same_run = 0
+
+    if i >= p:
+        y = a[i - p]
+        if y == y:
+            nobs -= 1
+            if nobs == 0:
+                mean = 0.0
+                m2 = 0.0
+            else:
+                delta = y - mean
+                mean -= delta / nobs
+                m2 -= delta * (y - mean)
+
+    # 窗口内全部相同时均值就是该值, 重置状态以清除累计的舍入误差
+    if same_run >= p:
+        mean = x
+        m2 = 0.0
+
+    std = np.nan
+    if nobs >= p and p > 1:
+        if same_run >= p or m2 <= 0.0:
+            std = 0.0
+        else:
+            std = np.sqrt(m2 / (nobs - 1))
+
+    return nobs, mean, m2, same_run, std
+
+
+@njit(cache=True, nogil=True)
+def _rolling_mean_std(a, p):
+    """一次遍历计算滑动窗口均值和样本标准差(ddof=1)"""
+    n = a.size
+    mean_out = np.full(n, np.nan)
+    std_out = np.empty(n)
+    nobs = 0
+    mean = 0.0
+    m2 = 0.0
+    same_run = 0
+
+    for i in range(n):
+        nobs, mean, m2, same_run, std_out[i] = _welford_step(
+            a, i, p, nobs, mean, m2, same_run
+        )
+        if nobs >= p:
+            mean_out[i] = mean
+
+    return mean_out, std_out
+
+
+@njit(cache=True, nogil=True)
+def _bbands(a, p, k):
+    """一次遍历计算布林带上轨、中线、下轨"""
+    n = a.size
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    m2 = 0.0
+    same_run = 0
+
+    for i in range(n):
+        nobs, mean, m2, same_run, std = _welford_step(a, i, p, nobs, mean, m2, same_run)
+        if nobs >= p:
+            middle[i] = mean
+            upper[i] = mean + std * k
+            lower[i] = mean - std * k
+
+    return upper, middle, lower
+
+
+@njit(cache=True, nogil=True)
+def _extreme_step(a, i, p, sign, queue, head, size, nobs):
+    """
+    单调双端队列的滑动窗口极值更新: 加入a[i]并移出a[i-p]
+
+    queue是容量为p的环形缓冲区, 存放窗口内的下标, 队首始终是窗口内的极值。
+    sign为1取最大值, 为-1取最小值。
+
+    Returns:
+        (head, size, nobs, value), 窗口不满或含NaN时value为NaN
+    """
+    if size > 0 and queue[head] <= i - p:
+        head = (head + 1) % p
+        size -= 1
+    if i >= p:
+        y = a[i - p]
+        if y == y:
+            nobs -= 1
+
+    x = a[i]
+    if x == x:
+        nobs += 1
+        while size > 0 and sign * a[queue[(head + size - 1) % p]] <= sign * x:
+            size -= 1
+        queue[(head + size) % p] = i
+        size += 1
+
+    value = a[queue[head]] if nobs >= p else np.nan
+    return head, size, nobs, value
+
+
+@njit(cache=True, nogil=True)
+def _stochastic(high, low, close, p, williams):
+    """
+    一次遍历计算窗口内最高价、最低价及收盘价所处位置
+
+    Returns:
+        williams为False时返回随机指标K值 (0到100), 为True时返回威廉指标 (-100到0)
+    """
+    n = close.size
+    out = np.empty(n)
+    high_queue = np.empty(p, dtype=np.int64)
+    low_queue = np.empty(p, dtype=np.int64)
+    high_head = 0
+    high_size = 0
+    high_nobs = 0
+    low_head = 0
+    low_size = 0
+    low_nobs = 0
+
+    for i in range(n):
+        high_head, high_size, high_nobs, highest = _extreme_step(
+            high, i, p, 1.0, high_queue, high_head, high_size, high_nobs
+        )
+        low_head, low_size, low_nobs, lowest = _extreme_step(
+            low, i, p, -1.0, low_queue, low_head, low_size, low_nobs
+        )
+        if williams:
+            out[i] = -100 * (highest - close[i]) / (highest - lowest + 1e-10)
+        else:
+            out[i] = 100 * (close[i] - lowest) / (highest - lowest + 1e-10)
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _obv(close, volume):
+    """能量潮累加"""
+    n = close.size
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    out[0] = volume[0]
+    for i in range(1, n):
+        if close[i] > close[i - 1]:
+            out[i] = out[i - 1] + volume[i]
+        elif close[i] < close[i - 1]:
+            out[i] = out[i - 1] - volume[i]
+        else:
+            out[i] = out[i - 1]
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _ewm_update(weighted, old_wt, x, alpha):
+    """指数加权均值的单步更新, 与 pandas ``ewm(adjust=False)`` 的缺失值处理一致"""
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if x == x:
+            if weighted != x:
+                weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+            old_wt = 1.0
+    elif x == x:
+        weighted = x
+    return weighted, old_wt
+
+
+@njit(cache=True, nogil=True)
+def _ema(data, span):
+    """指数移动平均, 等价于 pandas ``ewm(span=span, adjust=False).mean()``"""
+    alpha = 2.0 / (span + 1)
+    out = np.empty(data.size)
+    weighted = np.nan
+    old_wt = 1.0
+
+    for i in range(data.size):
+        weighted, old_wt = _ewm_update(weighted, old_wt, data[i], alpha)
+        out[i] = weighted
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _macd(data, alpha_fast, alpha_slow, alpha_signal):
+    """一次遍历同时计算快慢EMA、MACD线、信号线和柱状图"""
+    n = data.size
+    macd_line = np.empty(n)
+    signal_line = np.empty(n)
+    histogram = np.empty(n)
+
+    fast = np.nan
+    slow = np.nan
+    signal = np.nan
+    fast_wt = 1.0
+    slow_wt = 1.0
+    signal_wt = 1.0
+
+    for i in range(n):
+        fast, fast_wt = _ewm_update(fast, fast_wt, data[i], alpha_fast)
+        slow, slow_wt = _ewm_update(slow, slow_wt, data[i], alpha_slow)
+        line = fast - slow
+        signal, signal_wt = _ewm_update(signal, signal_wt, line, alpha_signal)
+
+        macd_line[i] = line
+        signal_line[i] = signal
+        histogram[i] = line - signal
+
+    return macd_line, signal_line, histogram
+
+
+def _warmup() -> None:
+    """导入时用单元素数组触发编译(或加载缓存), 避免首次调用时的JIT延迟"""
+    x = np.zeros(1)
+    _rolling_mean(x, 1)
+    _rolling_mean_std(x, 1)
+    _bbands(x, 1, 2.0)
+    _stochastic(x, x, x, 1, False)
+    _obv(x, x)
+    _ema(x, 1)
+    _macd(x, 0.5, 0.5, 0.5)
+
+
+_warmup()
@@ -2,65 +2,122 @@
 
 import numpy as np
 import pandas as pd
-from typing import List, Union, Tuple
+from typing import List, Optional, Union, Tuple
+
+from database._indicator_kernels import (
+    _bbands,
+    _ema,
+    _macd,
+    _obv,
+    _rolling_mean,
+    _rolling_mean_std,
+    _stochastic,
+)
+
+
+def _as_f64(data: Union[List, np.ndarray, pd.Series]) -> np.ndarray:
+    """
+    转换为连续的float64数组, 已是连续float64数组时不复制
+
+    float32等其他类型的输入只在入口处转换一次, 后续计算和Numba内核统一使用float64
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_numpy(dtype=np.float64, copy=False)
+    return np.ascontiguousarray(data, dtype=np.float64)
+
+
+def _use_gpu(backend: str) -> bool:
+    """校验计算后端参数, 返回是否使用GPU"""
+    if backend not in ("cpu", "gpu"):
+        raise ValueError(f"未知的计算后端: {backend}")
+    return backend == "gpu"
+
+
+def _gpu():
+    """延迟导入GPU实现, 未安装CuPy时不影响CPU计算"""
+    from database import metrics_gpu
+
+    return metrics_gpu
 
 
 class TechnicalIndicators:
-    """股票常用技术指标计算类"""
+    """
+    股票常用技术指标计算类
+
+    默认在CPU上逐只股票计算一维序列; backend="gpu" 时使用CuPy,
+    输入可为 (股票数, K线数) 的二维数组批量计算, 返回cupy数组, 见 metrics_gpu 模块;
+    CPU上的多股票批量计算见 metrics_batch 模块, 按股票分配到多个核心并行
+    """
 
     @staticmethod
-    def sma(data: Union[List, np.ndarray, pd.Series], period: int = 20) -> np.ndarray:
+    def sma(
+        data: Union[List, np.ndarray, pd.Series], period: int = 20, backend: str = "cpu"
+    ) -> np.ndarray:
         """
         简单移动平均线 (Simple Moving Average)
 
         Args:
             data: 价格数据
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             SMA值
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
-        return pd.Series(data).rolling(window=period).mean().values
+        if _use_gpu(backend):
+            return _gpu().sma(data, period)
+
+        data = _as_f64(data)
+        return _rolling_mean(data, period)
 
     @staticmethod
-    def ema(data: Union[List, np.ndarray, pd.Series], period: int = 20) -> np.ndarray:
+    def ema(
+        data: Union[List, np.ndarray, pd.Series], period: int = 20, backend: str = "cpu"
+    ) -> np.ndarray:
         """
         指数移动平均线 (Exponential Moving Average)
 
         Args:
             data: 价格数据
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             EMA值
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
-        return pd.Series(data).ewm(span=period, adjust=False).mean().values
+        if _use_gpu(backend):
+            return _gpu().ema(data, period)
+
+        data = _as_f64(data)
+        return _ema(data, period)
 
     @staticmethod
-    def rsi(data: Union[List, np.ndarray, pd.Series], period: int = 14) -> np.ndarray:
+    def rsi(
+        data: Union[List, np.ndarray, pd.Series], period: int = 14, backend: str = "cpu"
+    ) -> np.ndarray:
         """
         相对强弱指数 (Relative Strength Index)
 
         Args:
             data: 价格数据
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             RSI值 (0-100)
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
+        if _use_gpu(backend):
+            return _gpu().rsi(data, period)
+
+        data = _as_f64(data)
 
         delta = np.diff(data)
-        gain = np.where(delta > 0, delta, 0)
-        loss = np.where(delta < 0, -delta, 0)
+        gain = np.maximum(delta, 0.0)
+        loss = np.minimum(delta, 0.0)
+        np.negative(loss, out=loss)
 
-        avg_gain = pd.Series(gain).rolling(window=period).mean().values
-        avg_loss = pd.Series(loss).rolling(window=period).mean().values
+        avg_gain = _rolling_mean(gain, period)
+        avg_loss = _rolling_mean(loss, period)
 
         rs = avg_gain / (avg_loss + 1e-10)
         rsi = 100 - (100 / (1 + rs))
@@ -73,6 +130,7 @@ class TechnicalIndicators:
         fast: int = 12,
         slow: int = 26,
         signal: int = 9,
+        backend: str = "cpu",
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         MACD指标 (Moving Average Convergence Divergence)
@@ -82,25 +140,24 @@ class TechnicalIndicators:
             fast: 快速EMA周期
             slow: 慢速EMA周期
             signal: 信号线EMA周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             (MACD线, 信号线, 柱状图)
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
-
-        ema_fast = pd.Series(data).ewm(span=fast, adjust=False).mean().values
-        ema_slow = pd.Series(data).ewm(span=slow, adjust=False).mean().values
+        if _use_gpu(backend):
+            return _gpu().macd(data, fast, slow, signal)
 
-        macd_line = ema_fast - ema_slow
-        signal_line = pd.Series(macd_line).ewm(span=signal, adjust=False).mean().values
-        histogram = macd_line - signal_line
+        data = _as_f64(data)
 
-        return macd_line, signal_line, histogram
+        return _macd(data, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1))
 
     @staticmethod
     def bollinger_bands(
-        data: Union[List, np.ndarray, pd.Series], period: int = 20, std_dev: float = 2.0
+        data: Union[List, np.ndarray, pd.Series],
+        period: int = 20,
+        std_dev: float = 2.0,
+        backend: str = "cpu",
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         布林带 (Bollinger Bands)
@@ -109,21 +166,17 @@ class TechnicalIndicators:
             data: 价格数据
             period: 周期
             std_dev: 标准差倍数
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             (上轨, 中线, 下轨)
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
-
-        series = pd.Series(data)
-        middle_band = series.rolling(window=period).mean().values
-        std = series.rolling(window=period).std().values
+        if _use_gpu(backend):
+            return _gpu().bollinger_bands(data, period, std_dev)
 
-        upper_band = middle_band + (std * std_dev)
-        lower_band = middle_band - (std * std_dev)
+        data = _as_f64(data)
 
-        return upper_band, middle_band, lower_band
+        return _bbands(data, period, std_dev)
 
     @staticmethod
     def stochastic(
@@ -131,6 +184,7 @@ class TechnicalIndicators:
         low: Union[List, np.ndarray, pd.Series],
         close: Union[List, np.ndarray, pd.Series],
         period: int = 14,
+        backend: str = "cpu",
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         随机指标 (Stochastic Oscillator)
@@ -140,25 +194,20 @@ class TechnicalIndicators:
             low: 最低价
             close: 收盘价
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             (K线, D线)
         """
-        if isinstance(high, (list, pd.Series)):
-            high = np.array(high)
-        if isinstance(low, (list, pd.Series)):
-            low = np.array(low)
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
-
-        high_series = pd.Series(high)
-        low_series = pd.Series(low)
+        if _use_gpu(backend):
+            return _gpu().stochastic(high, low, close, period)
 
-        highest_high = high_series.rolling(window=period).max().values
-        lowest_low = low_series.rolling(window=period).min().values
+        high = _as_f64(high)
+        low = _as_f64(low)
+        close = _as_f64(close)
 
-        k_line = 100 * (close - lowest_low) / (highest_high - lowest_low + 1e-10)
-        d_line = pd.Series(k_line).rolling(window=3).mean().values
+        k_line = _stochastic(high, low, close, period, False)
+        d_line = _rolling_mean(k_line, 3)
 
         return k_line, d_line
 
@@ -168,6 +217,7 @@ class TechnicalIndicators:
         low: Union[List, np.ndarray, pd.Series],
         close: Union[List, np.ndarray, pd.Series],
         period: int = 14,
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         平均真实波幅 (Average True Range)
@@ -177,23 +227,30 @@ class TechnicalIndicators:
             low: 最低价
             close: 收盘价
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             ATR值
         """
-        if isinstance(high, (list, pd.Series)):
-            high = np.array(high)
-        if isinstance(low, (list, pd.Series)):
-            low = np.array(low)
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
+        if _use_gpu(backend):
+            return _gpu().atr(high, low, close, period)
 
-        tr1 = high - low
-        tr2 = np.abs(high - np.roll(close, 1))
-        tr3 = np.abs(low - np.roll(close, 1))
+        high = _as_f64(high)
+        low = _as_f64(low)
+        close = _as_f64(close)
 
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        atr = pd.Series(tr).rolling(window=period).mean().values
+        # 前一日收盘价, 首日没有前收盘价, 用当日收盘价代替
+        prev_close = np.empty_like(close)
+        prev_close[:1] = close[:1]
+        prev_close[1:] = close[:-1]
+
+        tr = high - low
+        tr2 = np.abs(high - prev_close)
+        tr3 = np.abs(low - prev_close)
+
+        np.maximum(tr, tr2, out=tr)
+        np.maximum(tr, tr3, out=tr)
+        atr = _rolling_mean(tr, period)
 
         return atr
 
@@ -201,6 +258,7 @@ class TechnicalIndicators:
     def obv(
         close: Union[List, np.ndarray, pd.Series],
         volume: Union[List, np.ndarray, pd.Series],
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         成交量指标 (On-Balance Volume)
@@ -208,52 +266,56 @@ class TechnicalIndicators:
         Args:
             close: 收盘价
             volume: 成交量
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             OBV值
         """
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
-        if isinstance(volume, (list, pd.Series)):
-            volume = np.array(volume)
-
-        obv = np.zeros(len(close))
-        obv[0] = volume[0]
+        if _use_gpu(backend):
+            return _gpu().obv(close, volume)
 
-        for i in range(1, len(close)):
-            if close[i] > close[i - 1]:
-                obv[i] = obv[i - 1] + volume[i]
-            elif close[i] < close[i - 1]:
-                obv[i] = obv[i - 1] - volume[i]
-            else:
-                obv[i] = obv[i - 1]
+        close = _as_f64(close)
+        volume = _as_f64(volume)
 
-        return obv
+        return _obv(close, volume)
 
     @staticmethod
-    def roc(data: Union[List, np.ndarray, pd.Series], period: int = 12) -> np.ndarray:
+    def roc(
+        data: Union[List, np.ndarray, pd.Series], period: int = 12, backend: str = "cpu"
+    ) -> np.ndarray:
         """
         变化率指标 (Rate of Change)
 
         Args:
             data: 价格数据
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             ROC值
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
+        if _use_gpu(backend):
+            return _gpu().roc(data, period)
+
+        data = _as_f64(data)
+
+        roc = np.zeros(len(data), dtype=np.float64)
+        if period >= len(data):
+            return roc
 
-        roc = np.zeros(len(data))
-        for i in range(period, len(data)):
-            roc[i] = ((data[i] - data[i - period]) / data[i - period]) * 100
+        # 基期价格为0时该点ROC记为0, 避免除零
+        base = data[:-period]
+        np.divide(data[period:] - base, base, out=roc[period:], where=base != 0)
+        roc[period:] *= 100
 
         return roc
 
     @staticmethod
     def apo(
-        data: Union[List, np.ndarray, pd.Series], fast: int = 12, slow: int = 26
+        data: Union[List, np.ndarray, pd.Series],
+        fast: int = 12,
+        slow: int = 26,
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         绝对价格振荡指标 (Absolute Price Oscillator)
@@ -262,17 +324,17 @@ class TechnicalIndicators:
             data: 价格数据
             fast: 快速EMA周期
             slow: 慢速EMA周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             APO值
         """
-        if isinstance(data, (list, pd.Series)):
-            data = np.array(data)
+        if _use_gpu(backend):
+            return _gpu().apo(data, fast, slow)
 
-        ema_fast = pd.Series(data).ewm(span=fast, adjust=False).mean().values
-        ema_slow = pd.Series(data).ewm(span=slow, adjust=False).mean().values
+        data = _as_f64(data)
 
-        return ema_fast - ema_slow
+        return _ema(data, fast) - _ema(data, slow)
 
     @staticmethod
     def vwap(
@@ -280,6 +342,8 @@ class TechnicalIndicators:
         low: Union[List, np.ndarray, pd.Series],
         close: Union[List, np.ndarray, pd.Series],
         volume: Union[List, np.ndarray, pd.Series],
+        out: Optional[np.ndarray] = None,
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         成交量加权平均价格 (Volume Weighted Average Price)
@@ -289,21 +353,24 @@ class TechnicalIndicators:
             low: 最低价
             close: 收盘价
             volume: 成交量
+            out: 结果写入的float64数组(可选), 逐bar重复计算时可复用
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             VWAP值
         """
-        if isinstance(high, (list, pd.Series)):
-            high = np.array(high)
-        if isinstance(low, (list, pd.Series)):
-            low = np.array(low)
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
-        if isinstance(volume, (list, pd.Series)):
-            volume = np.array(volume)
-
-        typical_price = (high + low + close) / 3
-        vwap = np.cumsum(typical_price * volume) / np.cumsum(volume)
+        if _use_gpu(backend):
+            return _gpu().vwap(high, low, close, volume)
+
+        high = _as_f64(high)
+        low = _as_f64(low)
+        close = _as_f64(close)
+        volume = _as_f64(volume)
+
+        vwap = TechnicalIndicators._typical_price(high, low, close, out=out)
+        np.multiply(vwap, volume, out=vwap)
+        np.cumsum(vwap, out=vwap)
+        vwap /= np.cumsum(volume)
 
         return vwap
 
@@ -313,6 +380,7 @@ class TechnicalIndicators:
         low: Union[List, np.ndarray, pd.Series],
         close: Union[List, np.ndarray, pd.Series],
         period: int = 14,
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         威廉指标 (Williams %R)
@@ -322,26 +390,19 @@ class TechnicalIndicators:
             low: 最低价
             close: 收盘价
             period: 周期
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             Williams %R值 (-100 到 0)
         """
-        if isinstance(high, (list, pd.Series)):
-            high = np.array(high)
-        if isinstance(low, (list, pd.Series)):
-            low = np.array(low)
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
-
-        high_series = pd.Series(high)
-        low_series = pd.Series(low)
+        if _use_gpu(backend):
+            return _gpu().williams_r(high, low, close, period)
 
-        highest_high = high_series.rolling(window=period).max().values
-        lowest_low = low_series.rolling(window=period).min().values
+        high = _as_f64(high)
+        low = _as_f64(low)
+        close = _as_f64(close)
 
-        williams_r = -100 * (highest_high - close) / (highest_high - lowest_low + 1e-10)
-
-        return williams_r
+        return _stochastic(high, low, close, period, True)
 
     @staticmethod
     def cci(
@@ -349,6 +410,8 @@ class TechnicalIndicators:
         low: Union[List, np.ndarray, pd.Series],
         close: Union[List, np.ndarray, pd.Series],
         period: int = 20,
+        out: Optional[np.ndarray] = None,
+        backend: str = "cpu",
     ) -> np.ndarray:
         """
         商品通道指数 (Commodity Channel Index)
@@ -358,23 +421,51 @@ class TechnicalIndicators:
             low: 最低价
             close: 收盘价
             period: 周期
+            out: 结果写入的float64数组(可选), 逐bar重复计算时可复用
+            backend: 计算后端, "cpu" 或 "gpu"
 
         Returns:
             CCI值
         """
-        if isinstance(high, (list, pd.Series)):
-            high = np.array(high)
-        if isinstance(low, (list, pd.Series)):
-            low = np.array(low)
-        if isinstance(close, (list, pd.Series)):
-            close = np.array(close)
+        if _use_gpu(backend):
+            return _gpu().cci(high, low, close, period)
+
+        high = _as_f64(high)
+        low = _as_f64(low)
+        close = _as_f64(close)
 
-        typical_price = (high + low + close) / 3
-        tp_series = pd.Series(typical_price)
+        typical_price = TechnicalIndicators._typical_price(high, low, close)
 
-        sma_tp = tp_series.rolling(window=period).mean().values
-        std_tp = tp_series.rolling(window=period).std().values
+        sma_tp, std_tp = _rolling_mean_std(typical_price, period)
 
-        cci = (typical_price - sma_tp) / (0.015 * std_tp + 1e-10)
+        cci = np.subtract(typical_price, sma_tp, out=out)
+        std_tp *= 0.015
+        std_tp += 1e-10
+        cci /= std_tp
 
         return cci
+
+    @staticmethod
+    def _typical_price(
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        典型价格 (最高价 + 最低价 + 收盘价) / 3
+
+        Args:
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+            out: 结果写入的float64数组(可选)
+
+        Returns:
+            典型价格
+        """
+        typical_price = np.add(high, low, out=out, dtype=np.float64)
+        typical_price += close
+        typical_price /= 3
+
+        return typical_price
@@ -0,0 +1,209 @@
+"""股票技术指标的多核批量计算 (Numba prange)
+
+输入为 (股票数, K线数) 的二维数组, 每行一只股票, 各股票分配到不同CPU核心并行计算,
+逐行调用与 TechnicalIndicators 相同的Numba内核, 结果与逐只计算完全一致。
+一维输入按单只股票处理。函数签名与 metrics_gpu 模块相同, 便于在两者间切换。
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+from database._indicator_kernels import (
+    _bbands,
+    _ema,
+    _macd,
+    _obv,
+    _rolling_mean,
+    _rolling_mean_std,
+    _stochastic,
+)
+
+
+def _as_f64(data) -> np.ndarray:
+    """转换为 (股票数, K线数) 的连续float64数组"""
+    return np.ascontiguousarray(np.atleast_2d(np.asarray(data, dtype=np.float64)))
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_rolling_mean(data, p):
+    out = np.empty_like(data)
+    for t in prange(data.shape[0]):
+        out[t] = _rolling_mean(data[t], p)
+    return out
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_ema(data, span):
+    out = np.empty_like(data)
+    for t in prange(data.shape[0]):
+        out[t] = _ema(data[t], span)
+    return out
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_rsi(data, p):
+    n_rows, n_cols = data.shape
+    out = np.empty((n_rows, max(n_cols - 1, 0)))
+    for t in prange(n_rows):
+        delta = np.diff(data[t])
+        gain = np.maximum(delta, 0.0)
+        loss = -np.minimum(delta, 0.0)
+        rs = _rolling_mean(gain, p) / (_rolling_mean(loss, p) + 1e-10)
+        out[t] = 100 - (100 / (1 + rs))
+    return out
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_macd(data, alpha_fast, alpha_slow, alpha_signal):
+    macd_line = np.empty_like(data)
+    signal_line = np.empty_like(data)
+    histogram = np.empty_like(data)
+    for t in prange(data.shape[0]):
+        macd_line[t], signal_line[t], histogram[t] = _macd(
+            data[t], alpha_fast, alpha_slow, alpha_signal
+        )
+    return macd_line, signal_line, histogram
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_bbands(data, p, k):
+    upper = np.empty_like(data)
+    middle = np.empty_like(data)
+    lower = np.empty_like(data)
+    for t in prange(data.shape[0]):
+        upper[t], middle[t], lower[t] = _bbands(data[t], p, k)
+    return upper, middle, lower
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_stochastic(high, low, close, p, williams):
+    k_line = np.empty_like(close)
+    d_line = np.empty_like(close)
+    for t in prange(close.shape[0]):
+        k_line[t] = _stochastic(high[t], low[t], close[t], p, williams)
+        d_line[t] = _rolling_mean(k_line[t], 3)
+    return k_line, d_line
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_obv(close, volume):
+    out = np.empty_like(close)
+    for t in prange(close.shape[0]):
+        out[t] = _obv(close[t], volume[t])
+    return out
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _batch_cci(typical_price, p):
+    out = np.empty_like(typical_price)
+    for t in prange(typical_price.shape[0]):
+        mean, std = _rolling_mean_std(typical_price[t], p)
+        out[t] = (typical_price[t] - mean) / (0.015 * std + 1e-10)
+    return out
+
+
+def _typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    out = np.add(high, low)
+    out += close
+    out /= 3
+    return out
+
+
+def sma(data, period: int = 20) -> np.ndarray:
+    """简单移动平均线"""
+    return _batch_rolling_mean(_as_f64(data), period)
+
+
+def ema(data, period: int = 20) -> np.ndarray:
+    """指数移动平均线"""
+    return _batch_ema(_as_f64(data), period)
+
+
+def rsi(data, period: int = 14) -> np.ndarray:
+    """相对强弱指数, 与单只计算一样比输入少一列"""
+    return _batch_rsi(_as_f64(data), period)
+
+
+def macd(
+    data, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD指标, 返回 (MACD线, 信号线, 柱状图)"""
+    return _batch_macd(
+        _as_f64(data), 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+    )
+
+
+def bollinger_bands(
+    data, period: int = 20, std_dev: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """布林带, 返回 (上轨, 中线, 下轨)"""
+    return _batch_bbands(_as_f64(data), period, std_dev)
+
+
+def stochastic(high, low, close, period: int = 14) -> Tuple[np.ndarray, np.ndarray]:
+    """随机指标, 返回 (K线, D线)"""
+    return _batch_stochastic(_as_f64(high), _as_f64(low), _as_f64(close), period, False)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """平均真实波幅"""
+    high = _as_f64(high)
+    low = _as_f64(low)
+    close = _as_f64(close)
+
+    prev_close = np.empty_like(close)
+    prev_close[:, :1] = close[:, :1]
+    prev_close[:, 1:] = close[:, :-1]
+
+    tr = high - low
+    np.maximum(tr, np.abs(high - prev_close), out=tr)
+    np.maximum(tr, np.abs(low - prev_close), out=tr)
+    return _batch_rolling_mean(tr, period)
+
+
+def obv(close, volume) -> np.ndarray:
+    """能量潮"""
+    return _batch_obv(_as_f64(close), _as_f64(volume))
+
+
+def roc(data, period: int = 12) -> np.ndarray:
+    """变化率指标, 基期价格为0时记为0"""
+    data = _as_f64(data)
+    out = np.zeros_like(data)
+    if period < data.shape[1]:
+        base = data[:, :-period]
+        np.divide(data[:, period:] - base, base, out=out[:, period:], where=base != 0)
+        out[:, period:] *= 100
+    return out
+
+
+def apo(data, fast: int = 12, slow: int = 26) -> np.ndarray:
+    """绝对价格振荡指标"""
+    data = _as_f64(data)
+    return _batch_ema(data, fast) - _batch_ema(data, slow)
+
+
+def vwap(high, low, close, volume) -> np.ndarray:
+    """成交量加权平均价格"""
+    volume = _as_f64(volume)
+    out = _typical_price(_as_f64(high), _as_f64(low), _as_f64(close))
+    out *= volume
+    np.cumsum(out, axis=1, out=out)
+    out /= np.cumsum(volume, axis=1)
+    return out
+
+
+def williams_r(high, low, close, period: int = 14) -> np.ndarray:
+    """威廉指标"""
+    williams, _ = _batch_stochastic(
+        _as_f64(high), _as_f64(low), _as_f64(close), period, True
+    )
+    return williams
+
+
+def cci(high, low, close, period: int = 20) -> np.ndarray:
+    """商品通道指数"""
+    typical_price = _typical_price(_as_f64(high), _as_f64(low), _as_f64(close))
+    return _batch_cci(typical_price, period)
@@ -0,0 +1,224 @@
+"""股票技术指标的GPU批量计算 (CuPy)
+
+输入为 (股票数, K线数) 的二维数组, 每行一只股票, 各指标沿 axis=1 独立计算,
+返回留在显存中的 cupy 数组, 需要时调用 ``.get()`` 取回。
+一维输入按单只股票处理。缺失值处理与CPU版本一致。
+"""
+
+from typing import Tuple
+
+import cupy as cp
+from cupy.lib.stride_tricks import sliding_window_view
+
+# 递推类指标(EMA)每个线程负责一只股票, 沿时间顺序递推。
+# 输入按 (K线数, 股票数) 存放, 同一时刻相邻线程访问相邻地址, 显存访问可合并。
+_EWM_KERNEL = cp.RawKernel(
+    r"""
+extern "C" __global__
+void ewm(const double* x, double* y, const double alpha,
+         const long long n_rows, const long long n_cols) {
+    long long row = (long long)blockDim.x * blockIdx.x + threadIdx.x;
+    if (row >= n_rows) {
+        return;
+    }
+
+    double weighted = nan("");
+    double old_wt = 1.0;
+    for (long long i = 0; i < n_cols; ++i) {
+        double v = x[i * n_rows + row];
+        if (!isnan(weighted)) {
+            old_wt *= 1.0 - alpha;
+            if (!isnan(v)) {
+                if (weighted != v) {
+                    weighted = (old_wt * weighted + alpha * v) / (old_wt + alpha);
+                }
+                old_wt = 1.0;
+            }
+        } else if (!isnan(v)) {
+            weighted = v;
+        }
+        y[i * n_rows + row] = weighted;
+    }
+}
+""",
+    "ewm",
+)
+
+_THREADS_PER_BLOCK = 128
+
+
+def _as_f64(data) -> cp.ndarray:
+    """转换为 (股票数, K线数) 的连续float64 cupy数组"""
+    return cp.ascontiguousarray(cp.atleast_2d(cp.asarray(data, dtype=cp.float64)))
+
+
+def _rolling(data: cp.ndarray, period: int, reduce) -> cp.ndarray:
+    """滑动窗口规约, 前 period-1 列及含NaN的窗口为NaN"""
+    out = cp.full(data.shape, cp.nan)
+    if period <= data.shape[1]:
+        windows = sliding_window_view(data, period, axis=1)
+        out[:, period - 1 :] = reduce(windows)
+    return out
+
+
+def _rolling_mean(data: cp.ndarray, period: int) -> cp.ndarray:
+    return _rolling(data, period, lambda w: w.mean(axis=-1))
+
+
+def _rolling_std(data: cp.ndarray, period: int) -> cp.ndarray:
+    return _rolling(data, period, lambda w: w.std(axis=-1, ddof=1))
+
+
+def _rolling_max(data: cp.ndarray, period: int) -> cp.ndarray:
+    return _rolling(data, period, lambda w: w.max(axis=-1))
+
+
+def _rolling_min(data: cp.ndarray, period: int) -> cp.ndarray:
+    return _rolling(data, period, lambda w: w.min(axis=-1))
+
+
+def _ewm(data: cp.ndarray, period: int) -> cp.ndarray:
+    """指数加权均值, 等价于 pandas ``ewm(span=period, adjust=False)``"""
+    n_rows, n_cols = data.shape
+    transposed = cp.ascontiguousarray(data.T)
+    out = cp.empty_like(transposed)
+    blocks = (n_rows + _THREADS_PER_BLOCK - 1) // _THREADS_PER_BLOCK
+    _EWM_KERNEL(
+        (blocks,),
+        (_THREADS_PER_BLOCK,),
+        (
+            transposed,
+            out,
+            cp.float64(2.0 / (period + 1)),
+            cp.int64(n_rows),
+            cp.int64(n_cols),
+        ),
+    )
+    return out.T
+
+
+def _typical_price(high: cp.ndarray, low: cp.ndarray, close: cp.ndarray) -> cp.ndarray:
+    return (high + low + close) / 3
+
+
+def sma(data, period: int = 20) -> cp.ndarray:
+    """简单移动平均线"""
+    return _rolling_mean(_as_f64(data), period)
+
+
+def ema(data, period: int = 20) -> cp.ndarray:
+    """指数移动平均线"""
+    return _ewm(_as_f64(data), period)
+
+
+def rsi(data, period: int = 14) -> cp.ndarray:
+    """相对强弱指数, 与CPU版本一样比输入少一列"""
+    delta = cp.diff(_as_f64(data), axis=1)
+    gain = cp.maximum(delta, 0.0)
+    loss = -cp.minimum(delta, 0.0)
+
+    rs = _rolling_mean(gain, period) / (_rolling_mean(loss, period) + 1e-10)
+    return 100 - (100 / (1 + rs))
+
+
+def macd(
+    data, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[cp.ndarray, cp.ndarray, cp.ndarray]:
+    """MACD指标, 返回 (MACD线, 信号线, 柱状图)"""
+    data = _as_f64(data)
+    macd_line = _ewm(data, fast) - _ewm(data, slow)
+    signal_line = _ewm(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_bands(
+    data, period: int = 20, std_dev: float = 2.0
+) -> Tuple[cp.ndarray, cp.ndarray, cp.ndarray]:
+    """布林带, 返回 (上轨, 中线, 下轨)"""
+    data = _as_f64(data)
+    middle_band = _rolling_mean(data, period)
+    std = _rolling_std(data, period)
+    return middle_band + std * std_dev, middle_band, middle_band - std * std_dev
+
+
+def stochastic(high, low, close, period: int = 14) -> Tuple[cp.ndarray, cp.ndarray]:
+    """随机指标, 返回 (K线, D线)"""
+    close = _as_f64(close)
+    highest_high = _rolling_max(_as_f64(high), period)
+    lowest_low = _rolling_min(_as_f64(low), period)
+
+    k_line = 100 * (close - lowest_low) / (highest_high - lowest_low + 1e-10)
+    return k_line, _rolling_mean(k_line, 3)
+
+
+def atr(high, low, close, period: int = 14) -> cp.ndarray:
+    """平均真实波幅"""
+    high = _as_f64(high)
+    low = _as_f64(low)
+    close = _as_f64(close)
+
+    prev_close = cp.empty_like(close)
+    prev_close[:, :1] = close[:, :1]
+    prev_close[:, 1:] = close[:, :-1]
+
+    tr = cp.maximum(
+        high - low,
+        cp.maximum(cp.abs(high - prev_close), cp.abs(low - prev_close)),
+    )
+    return _rolling_mean(tr, period)
+
+
+def obv(close, volume) -> cp.ndarray:
+    """能量潮, 收盘价缺失时沿用前值"""
+    close = _as_f64(close)
+    volume = _as_f64(volume)
+
+    direction = cp.sign(cp.diff(close, axis=1))
+    direction[cp.isnan(direction)] = 0
+
+    out = cp.empty_like(close)
+    out[:, :1] = volume[:, :1]
+    out[:, 1:] = volume[:, :1] + cp.cumsum(direction * volume[:, 1:], axis=1)
+    return out
+
+
+def roc(data, period: int = 12) -> cp.ndarray:
+    """变化率指标, 基期价格为0时记为0"""
+    data = _as_f64(data)
+    out = cp.zeros_like(data)
+    if period < data.shape[1]:
+        base = data[:, :-period]
+        safe_base = cp.where(base != 0, base, 1.0)
+        out[:, period:] = cp.where(
+            base != 0, (data[:, period:] - base) / safe_base * 100, 0.0
+        )
+    return out
+
+
+def apo(data, fast: int = 12, slow: int = 26) -> cp.ndarray:
+    """绝对价格振荡指标"""
+    data = _as_f64(data)
+    return _ewm(data, fast) - _ewm(data, slow)
+
+
+def vwap(high, low, close, volume) -> cp.ndarray:
+    """成交量加权平均价格"""
+    volume = _as_f64(volume)
+    typical_price = _typical_price(_as_f64(high), _as_f64(low), _as_f64(close))
+    return cp.cumsum(typical_price * volume, axis=1) / cp.cumsum(volume, axis=1)
+
+
+def williams_r(high, low, close, period: int = 14) -> cp.ndarray:
+    """威廉指标"""
+    close = _as_f64(close)
+    highest_high = _rolling_max(_as_f64(high), period)
+    lowest_low = _rolling_min(_as_f64(low), period)
+    return -100 * (highest_high - close) / (highest_high - lowest_low + 1e-10)
+
+
+def cci(high, low, close, period: int = 20) -> cp.ndarray:
+    """商品通道指数"""
+    typical_price = _typical_price(_as_f64(high), _as_f64(low), _as_f64(close))
+    sma_tp = _rolling_mean(typical_price, period)
+    std_tp = _rolling_std(typical_price, period)
+    return (typical_price - sma_tp) / (0.015 * std_tp + 1e-10)
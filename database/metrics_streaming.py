@@ -0,0 +1,301 @@
+"""股票技术指标的逐笔(流式)计算
+
+每个类保存滚动窗口状态, ``update`` 每次只处理一个新数据点, 复杂度为O(1),
+适合实盘逐笔行情。输出与 TechnicalIndicators 对应指标在同一位置的值一致。
+"""
+
+import math
+from collections import deque
+from typing import Tuple
+
+
+class StreamingSMA:
+    """流式简单移动平均线"""
+
+    def __init__(self, period: int = 20):
+        """
+        Args:
+            period: 周期
+        """
+        self.period = period
+        self._window = deque()
+        self._total = 0.0
+        self._nan_count = 0
+        self._updates = 0
+
+    def update(self, value: float) -> float:
+        """
+        加入一个新数据点
+
+        Args:
+            value: 价格
+
+        Returns:
+            当前SMA值, 窗口不满或含NaN时为NaN
+        """
+        self._window.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._total += value
+
+        if len(self._window) > self.period:
+            old = self._window.popleft()
+            if math.isnan(old):
+                self._nan_count -= 1
+            else:
+                self._total -= old
+
+        # 每滑过一整个窗口重新求和一次, 消除长期运行的累计舍入误差
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._total = math.fsum(x for x in self._window if not math.isnan(x))
+
+        if len(self._window) < self.period or self._nan_count:
+            return math.nan
+        return self._total / self.period
+
+
+class StreamingEMA:
+    """流式指数移动平均线, 与 pandas ``ewm(span=period, adjust=False)`` 一致"""
+
+    def __init__(self, period: int = 20):
+        """
+        Args:
+            period: 周期
+        """
+        self.period = period
+        self._alpha = 2.0 / (period + 1)
+        self._weighted = math.nan
+        self._old_wt = 1.0
+
+    def update(self, value: float) -> float:
+        """
+        加入一个新数据点
+
+        Args:
+            value: 价格
+
+        Returns:
+            当前EMA值
+        """
+        if not math.isnan(self._weighted):
+            self._old_wt *= 1.0 - self._alpha
+            if not math.isnan(value):
+                if self._weighted != value:
+                    self._weighted = (
+                        self._old_wt * self._weighted + self._alpha * value
+                    ) / (self._old_wt + self._alpha)
+                self._old_wt = 1.0
+        elif not math.isnan(value):
+            self._weighted = value
+        return self._weighted
+
+
+class StreamingRSI:
+    """流式相对强弱指数, 涨跌幅均值的计算方式与 TechnicalIndicators.rsi 一致"""
+
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period: 周期
+        """
+        self.period = period
+        self._prev = None
+        self._avg_gain = StreamingSMA(period)
+        self._avg_loss = StreamingSMA(period)
+
+    def update(self, value: float) -> float:
+        """
+        加入一个新价格
+
+        Args:
+            value: 价格
+
+        Returns:
+            当前RSI值 (0-100), 数据不足时为NaN
+        """
+        prev, self._prev = self._prev, value
+        if prev is None:
+            return math.nan
+
+        delta = value - prev
+        # max 的第一个参数为NaN时原样返回NaN, 与 np.maximum 一致
+        avg_gain = self._avg_gain.update(max(delta, 0.0))
+        avg_loss = self._avg_loss.update(max(-delta, 0.0))
+
+        rs = avg_gain / (avg_loss + 1e-10)
+        return 100 - (100 / (1 + rs))
+
+
+class StreamingBB:
+    """流式布林带, 使用Welford增删更新窗口均值和方差"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        """
+        Args:
+            period: 周期
+            std_dev: 标准差倍数
+        """
+        self.period = period
+        self.std_dev = std_dev
+        self._window = deque()
+        self._nan_count = 0
+        self._nobs = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._same_run = 0
+        self._updates = 0
+
+    def _add(self, value: float) -> None:
+        self._nobs += 1
+        delta = value - self._mean
+        self._mean += delta / self._nobs
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value: float) -> None:
+        self._nobs -= 1
+        if self._nobs == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._nobs
+        self._m2 -= delta * (value - self._mean)
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        """
+        加入一个新数据点
+
+        Args:
+            value: 价格
+
+        Returns:
+            (上轨, 中线, 下轨), 窗口不满或含NaN时为NaN
+        """
+        # 连续相同值的个数, 窗口内全部相同时标准差精确为0
+        if math.isnan(value):
+            self._same_run = 0
+        elif self._window and value == self._window[-1]:
+            self._same_run += 1
+        else:
+            self._same_run = 1
+
+        self._window.append(value)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            self._add(value)
+
+        if len(self._window) > self.period:
+            old = self._window.popleft()
+            if math.isnan(old):
+                self._nan_count -= 1
+            else:
+                self._remove(old)
+
+        # 每滑过一整个窗口从缓冲区重算一次, 消除累计舍入误差
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._nobs = 0
+            self._mean = 0.0
+            self._m2 = 0.0
+            for x in self._window:
+                if not math.isnan(x):
+                    self._add(x)
+
+        # 窗口内全部相同时均值就是该值, 重置状态以清除累计的舍入误差
+        if self._same_run >= self.period:
+            self._mean = value
+            self._m2 = 0.0
+
+        if len(self._window) < self.period or self._nan_count:
+            return math.nan, math.nan, math.nan
+
+        if self.period == 1:
+            std = math.nan
+        elif self._same_run >= self.period or self._m2 <= 0.0:
+            std = 0.0
+        else:
+            std = math.sqrt(self._m2 / (self.period - 1))
+        return (
+            self._mean + std * self.std_dev,
+            self._mean,
+            self._mean - std * self.std_dev,
+        )
+
+
+class StreamingMinMax:
+    """流式滑动窗口最大值/最小值, 单调双端队列实现"""
+
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period: 周期
+        """
+        self.period = period
+        self._index = -1
+        self._max_queue = deque()
+        self._min_queue = deque()
+        self._nan_indices = deque()
+
+    def update(self, value: float) -> Tuple[float, float]:
+        """
+        加入一个新数据点
+
+        Args:
+            value: 价格
+
+        Returns:
+            (窗口最大值, 窗口最小值), 窗口不满或含NaN时为NaN
+        """
+        self._index += 1
+        start = self._index - self.period + 1
+
+        for queue in (self._max_queue, self._min_queue):
+            if queue and queue[0][0] < start:
+                queue.popleft()
+        if self._nan_indices and self._nan_indices[0] < start:
+            self._nan_indices.popleft()
+
+        if math.isnan(value):
+            self._nan_indices.append(self._index)
+        else:
+            while self._max_queue and self._max_queue[-1][1] <= value:
+                self._max_queue.pop()
+            self._max_queue.append((self._index, value))
+            while self._min_queue and self._min_queue[-1][1] >= value:
+                self._min_queue.pop()
+            self._min_queue.append((self._index, value))
+
+        if start < 0 or self._nan_indices:
+            return math.nan, math.nan
+        return self._max_queue[0][1], self._min_queue[0][1]
+
+
+class StreamingOBV:
+    """流式能量潮"""
+
+    def __init__(self):
+        self._prev_close = None
+        self._obv = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        """
+        加入一根新K线
+
+        Args:
+            close: 收盘价
+            volume: 成交量
+
+        Returns:
+            当前OBV值
+        """
+        if self._prev_close is None:
+            self._obv = volume
+        elif close > self._prev_close:
+            self._obv += volume
+        elif close < self._prev_close:
+            self._obv -= volume
+        self._prev_close = close
+        return self._obv
@@ -1,7 +1,9 @@
 import pymysql
 import sys
 import csv
+import re
 
+from itertools import islice
 from typing import Union
 
 from config.mysql_config import MYSQL_CONFIG
@@ -11,6 +13,9 @@ from loguru import logger
 # Logger.set_name(new_name = 'MYSQL')
 class MYSQL:
     _DEFAULT_CONFIG = MYSQL_CONFIG
+    # 只接受LOAD DATA能原样解析的数字写法; 不超过18位的整数一定在BIGINT范围内
+    _BIGINT_PATTERN = re.compile(r'-?[0-9]{1,18}')
+    _DOUBLE_PATTERN = re.compile(r'-?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?')
     def __init__(self, **kwargs):
         for name, default in self._DEFAULT_CONFIG.items():
             setattr(self, name, kwargs.get(name, default))
@@ -26,6 +31,21 @@ class MYSQL:
     def database(self, value):
         self._database = value
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''
+        关闭数据库连接, 实例可用于多次导入, 用完后调用或使用 with 语句
+        :return: None
+        '''
+        if self.mysql_connection.open:
+            self.mysql_connection.close()
+            logger.info("数据库连接已关闭")
+
     def _connection(self) -> None:
         '''
         :return: None
@@ -55,6 +75,9 @@ class MYSQL:
             logger.error(f"{csv_path} 不存在")
             return
 
+        # 连接在多次导入之间复用, 长时间空闲被服务端断开时自动重连
+        self.mysql_connection.ping(reconnect=True)
+
         escaped_path = pymysql.converters.escape_string(csv_path)
         escaped_table = pymysql.converters.escape_string(table_name)
         escaped_delimiter = pymysql.converters.escape_string(delimiter)
@@ -90,8 +113,6 @@ class MYSQL:
             logger.info(f"成功导入数据到表 {table_name}, 共 {cursor.rowcount} 行")
         except Exception as e:
             logger.error(f"导入数据到表 {table_name} 失败: {e}")
-        finally:
-            self.mysql_connection.close()
 
     def create_table(self, cursor: pymysql.cursors.Cursor, table_name: str, headers: zip) -> None:
         '''
@@ -109,23 +130,46 @@ class MYSQL:
         except Exception as e:
             logger.error(f"创建表 {table_name} 失败: {e}")
 
-    def _get_csv_header(self, csv_path: str) -> zip:
+    def _get_csv_header(self, csv_path: str, sample_rows: int = 1000) -> zip:
         '''
         :param csv_path: csv文件路径
+        :param sample_rows: 用于推断列类型的样本行数
         :return: zip
         '''
 
         with open(csv_path, 'r') as f:
-            lines = f.readlines()[1:] # xbx的csv第一行有广子，忽略第一行
-            reader = csv.reader(lines)
+            next(f) # xbx的csv第一行有广子，忽略第一行
+            reader = csv.reader(f) # 文件对象本身就是迭代器，只读取需要的行
             headers = next(reader)
+            rows = list(islice(reader, sample_rows))
+
+        # 短行补空值, zip(*rows) 才不会截掉末尾的列; 只有表头时每列都没有样本
+        n_cols = len(headers)
+        rows = [row[:n_cols] + [''] * (n_cols - len(row)) for row in rows]
+        columns = list(zip(*rows)) if rows else [()] * n_cols
+
+        col_types = [self._infer_column_type(column) for column in columns]
+        return zip(headers, col_types)
+
+    @staticmethod
+    def _infer_column_type(values: tuple) -> str:
+        '''
+        按 BIGINT -> DOUBLE -> VARCHAR 的顺序匹配整列样本, 空值不参与判断,
+        Python的int()/float()接受 '1_000'、' 12 '、'nan' 等MySQL不认的写法, 因此用正则严格匹配,
+        VARCHAR长度至少为255且为样本最大长度的两倍, 超过utf8mb4下VARCHAR的上限时用TEXT
+        :param values: 同一列的样本值
+        :return: MySQL列类型
+        '''
+
+        values = [value for value in values if value != '']
+        if not values:
+            return 'VARCHAR(255)'
 
-            sample_row = next(reader)
-            col_types = []
-            for value in sample_row:
-                if value.isdigit():
-                    col_types.append('INT')
-                else:
-                    col_types.append('VARCHAR(255)')
+        for typ, pattern in (('BIGINT', MYSQL._BIGINT_PATTERN), ('DOUBLE', MYSQL._DOUBLE_PATTERN)):
+            if all(pattern.fullmatch(value) for value in values):
+                return typ
 
-            return zip(headers, col_types)
+        # 长度只来自样本, 留出余量, 样本之后更长的值才不会被截断或拒绝导入
+        max_len = max(len(value) for value in values)
+        length = max(255, max_len * 2)
+        return f"VARCHAR({length})" if length <= 16383 else 'TEXT'
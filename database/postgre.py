@@ -1,15 +1,175 @@
 """PostgreSQL数据库操作模块"""
 
+import io
+import json
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, count, groupby
+from operator import itemgetter
+from pathlib import Path
+from uuid import uuid4
 import psycopg2
 from psycopg2 import sql, Error
-from typing import Any, List, Dict, Optional, Tuple
+from psycopg2.extensions import (
+    DECIMAL,
+    FLOAT,
+    TRANSACTION_STATUS_INERROR,
+    encodings,
+    make_dsn,
+    new_type,
+    register_type,
+)
+from psycopg2.extras import (
+    execute_batch,
+    execute_values,
+    Json,
+    register_default_json,
+    register_default_jsonb,
+)
+from psycopg2.pool import ThreadedConnectionPool
+from urllib.parse import quote
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 import pandas as pd
 from loguru import logger
 
+# COPY text格式中需要转义的字符
+_COPY_ESCAPES = {
+    ord("\\"): "\\\\",
+    ord("\t"): "\\t",
+    ord("\n"): "\\n",
+    ord("\r"): "\\r",
+}
+
+
+def _copy_text(value: Any) -> str:
+    """把Python值转换为 COPY text 格式的列值, 转义之前的形式, 与psycopg2插入时的类型对应"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, list):
+        return _array_literal(value)
+    if isinstance(value, Json):
+        return value.dumps(value.adapted)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def _array_literal(values: list) -> str:
+    """把列表转换为数组字面量 {...}, 元素都加双引号, 嵌套列表对应多维数组"""
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        elif isinstance(value, list):
+            items.append(_array_literal(value))
+        else:
+            text = _copy_text(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{text}"')
+    return "{" + ",".join(items) + "}"
+
+
+# NUMERIC按float解析, 省去逐个构造Decimal对象的开销
+_NUMERIC_AS_FLOAT = new_type(DECIMAL.values, "NUMERIC_AS_FLOAT", FLOAT)
+
+# 列类型OID到pyarrow类型的映射, 值为 (pyarrow类型函数名, 参数...), 未列出的类型按字符串导出
+_ARROW_TYPES = {
+    16: ("bool_",),
+    17: ("binary",),
+    20: ("int64",),
+    21: ("int16",),
+    23: ("int32",),
+    700: ("float32",),
+    701: ("float64",),
+    1700: ("float64",),
+    19: ("string",),
+    25: ("string",),
+    114: ("string",),
+    1042: ("string",),
+    1043: ("string",),
+    1082: ("date32",),
+    1114: ("timestamp", "us"),
+    1184: ("timestamp", "us", "UTC"),
+    3802: ("string",),
+}
+
+# psycopg2的 %s 占位符与转义的 %%
+_PARAM_PATTERN = re.compile(r"%%|%s")
+
+
+def _positional_placeholders(n: int) -> str:
+    """生成 $1, $2, ..., $n 形式的预备语句参数占位符"""
+    return ", ".join(f"${i}" for i in range(1, n + 1))
+
+
+def _scalar_params(where: str, params: Optional[Iterable]) -> bool:
+    """
+    WHERE子句及其参数能否用于预备语句
+
+    预备语句的参数由服务端按 $n 绑定, 只能是单个值; 元组(IN %s)等需要psycopg2在客户端
+    展开成SQL片段的参数, 以及 %(name)s 命名参数, 都只能按普通语句执行
+    """
+    if "%(" in where or isinstance(params, dict):
+        return False
+    return not any(isinstance(p, (tuple, list, dict)) for p in params or ())
+
+
+def _table_identifier(table: str) -> sql.Identifier:
+    """表名转换为标识符, 带模式名的 "schema.table" 按 . 拆开分别加引号"""
+    return sql.Identifier(*table.split("."))
+
+
+def _to_positional(query: str, start: int = 1) -> str:
+    """把psycopg2风格的 %s 占位符依次替换为 $start, $start+1, ..., %% 还原为 %"""
+    counter = count(start)
+    return _PARAM_PATTERN.sub(
+        lambda m: "%" if m.group() == "%%" else f"${next(counter)}", query
+    )
+
+
+class _CopyStream(io.TextIOBase):
+    """把逐行生成的COPY文本包装成 copy_expert 可读取的文件对象, 不在内存中拼出整个文件"""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
 
 class PostgreSQL:
     """PostgreSQL数据库操作类"""
 
+    # insert_many 默认在达到该行数时改用 COPY 导入
+    _COPY_THRESHOLD = 5000
+
+    # 每个连接最多保留的预备语句数, 超出时释放最久未使用的
+    _MAX_PREPARED = 256
+
+    # DSN -> 连接池, 同一数据库的所有实例共享
+    _pools: Dict[str, ThreadedConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(
         self,
         host: str = "localhost",
@@ -17,6 +177,7 @@ class PostgreSQL:
         database: str = "A",
         user: str = "postgres",
         password: str = "123456",
+        use_pool: bool = False,
     ):
         """
         初始化PostgreSQL连接
@@ -27,14 +188,84 @@ class PostgreSQL:
             database: 数据库名
             user: 用户名
             password: 密码
+            use_pool: 是否从共享连接池获取连接, 断开时归还而不是关闭
         """
         self.host = host
         self.port = port
         self.database = database
         self.user = user
         self.password = password
+        self.use_pool = use_pool
         self.connection = None
         self.cursor = None
+        # 取出当前连接的连接池, 断开时归还给它
+        self._pool: Optional[ThreadedConnectionPool] = None
+        # 表名 -> {列名: 列类型}, 批量更新时为VALUES中的参数标注类型
+        self._column_type_cache: Dict[str, Dict[str, str]] = {}
+        # 语句缓存键 -> 预备语句名, 预备语句属于连接, 重新连接时清空
+        self._prepared: OrderedDict[Tuple, str] = OrderedDict()
+        self._statement_ids = count()
+        # pipeline() 块内延迟提交, 记录块内是否有语句失败
+        self._in_pipeline = False
+        self._pipeline_failed = False
+
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError("连接PostgreSQL失败")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.disconnect()
+
+    @property
+    def dsn(self) -> str:
+        """连接URI, 主机为Unix socket目录时同样适用"""
+        return (
+            f"postgresql://{quote(self.user, safe='')}:{quote(self.password, safe='')}"
+            f"@{quote(self.host, safe='')}:{self.port}/{quote(self.database, safe='')}"
+        )
+
+    @classmethod
+    def get_pool(
+        cls,
+        host: str = "localhost",
+        port: int = 5432,
+        database: str = "A",
+        user: str = "postgres",
+        password: str = "123456",
+        minconn: int = 4,
+        maxconn: int = 8,
+    ) -> ThreadedConnectionPool:
+        """
+        获取(首次调用时创建)指定数据库的线程安全连接池
+
+        Args:
+            host: 主机地址
+            port: 端口号
+            database: 数据库名
+            user: 用户名
+            password: 密码
+            minconn: 保留的空闲连接数, 归还时超出该数量的连接会被关闭
+            maxconn: 最多连接数
+
+        Returns:
+            按DSN缓存的连接池
+        """
+        dsn = make_dsn(
+            host=host, port=port, dbname=database, user=user, password=password
+        )
+        with cls._pools_lock:
+            if dsn not in cls._pools:
+                cls._pools[dsn] = ThreadedConnectionPool(minconn, maxconn, dsn)
+            return cls._pools[dsn]
+
+    @classmethod
+    def close_pools(cls) -> None:
+        """关闭所有连接池中的连接"""
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.closeall()
+            cls._pools.clear()
 
     def connect(self) -> bool:
         """
@@ -44,14 +275,22 @@ class PostgreSQL:
             连接是否成功
         """
         try:
-            self.connection = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-            )
+            if self.use_pool:
+                self._pool = self.get_pool(
+                    self.host, self.port, self.database, self.user, self.password
+                )
+                self.connection = self._pool.getconn()
+            else:
+                self.connection = psycopg2.connect(
+                    host=self.host,
+                    port=self.port,
+                    database=self.database,
+                    user=self.user,
+                    password=self.password,
+                )
             self.cursor = self.connection.cursor()
+            self._prepared = OrderedDict()
+            self._statement_ids = count()
             logger.info(
                 f"成功连接到PostgreSQL: {self.user}@{self.host}:{self.port}/{self.database}"
             )
@@ -61,14 +300,83 @@ class PostgreSQL:
             return False
 
     def disconnect(self) -> None:
-        """断开数据库连接"""
+        """断开数据库连接, 使用连接池时将连接归还连接池"""
         if self.cursor:
             self.cursor.close()
         if self.connection:
-            self.connection.close()
-            logger.info("数据库连接已关闭")
+            if self.use_pool:
+                discard = False
+                try:
+                    if not self.connection.closed:
+                        # 先结束未提交或已中止的事务, 否则之后的语句都会失败
+                        self.connection.rollback()
+                        # 连接会被其他实例复用, 释放本实例创建的预备语句以免重名
+                        if self._prepared:
+                            with self.connection.cursor() as cursor:
+                                cursor.execute("DEALLOCATE ALL")
+                            self.connection.commit()
+                except Error as e:
+                    # 清理失败的连接可能残留预备语句, 直接关闭不再复用
+                    discard = True
+                    logger.warning(f"清理连接失败, 关闭该连接: {e}")
+                finally:
+                    # close_pools() 之后连接池已关闭, 其中的连接也已关闭, 无需归还
+                    if not self._pool.closed:
+                        self._pool.putconn(self.connection, close=discard)
+                self._pool = None
+                self.connection = None
+                self.cursor = None
+                logger.info("数据库连接已归还连接池")
+            else:
+                self.connection.close()
+                logger.info("数据库连接已关闭")
 
-    def execute_query(self, query: str, params: Optional[Tuple] = None) -> bool:
+    @contextmanager
+    def pipeline(self):
+        """
+        在同一个事务中执行一批语句, 块内各方法不再逐条提交, 退出时统一提交一次
+
+        psycopg2不支持libpq的pipeline模式, 这里合并的是每条语句各自的COMMIT往返和落盘。
+        块内任一语句失败后事务中止, 之后的语句都会失败并返回False, 退出时整体回滚。
+
+        用法:
+            with db.pipeline():
+                for row in rows:
+                    db.insert_data(table, row)
+        """
+        self._in_pipeline = True
+        self._pipeline_failed = False
+        try:
+            yield self
+        except BaseException:
+            self._pipeline_failed = True
+            raise
+        finally:
+            self._in_pipeline = False
+            # 未经本类方法报告的失败同样会使事务中止, 此时COMMIT实际执行的是回滚
+            if self.connection.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+                self._pipeline_failed = True
+            if self._pipeline_failed:
+                self.connection.rollback()
+                logger.error("pipeline中有语句执行失败, 已整体回滚")
+            else:
+                self.connection.commit()
+
+    def _commit(self) -> None:
+        """提交事务, pipeline() 块内推迟到块结束时提交"""
+        if not self._in_pipeline:
+            self.connection.commit()
+
+    def _rollback(self) -> None:
+        """回滚事务, pipeline() 块内只记录失败, 块结束时整体回滚"""
+        if self._in_pipeline:
+            self._pipeline_failed = True
+        else:
+            self.connection.rollback()
+
+    def execute_query(
+        self, query: Union[str, sql.Composable], params: Optional[Tuple] = None
+    ) -> bool:
         """
         执行数据库查询（用于INSERT, UPDATE, DELETE）
 
@@ -84,16 +392,101 @@ class PostgreSQL:
                 self.cursor.execute(query, params)
             else:
                 self.cursor.execute(query)
-            self.connection.commit()
+            self._commit()
             logger.info(f"查询执行成功: {self.cursor.rowcount} 行受影响")
             return True
         except Error as e:
-            self.connection.rollback()
+            self._rollback()
             logger.error(f"执行查询失败: {e}")
             return False
 
+    def _prepare(self, key: Tuple, query: str, recoverable: bool = False) -> None:
+        """
+        在当前连接上创建预备语句, 之后同样的语句只需EXECUTE, 服务端不再重复解析和规划
+
+        Args:
+            key: 预备语句缓存键
+            query: 使用 $1, $2, ... 作为参数占位符的SQL语句
+            recoverable: 调用方在PREPARE失败后会改用普通语句执行; pipeline() 块内
+                此时用保存点撤销失败的PREPARE, 不把整个块标记为失败
+        """
+        name = f"stmt_{next(self._statement_ids)}"
+        savepoint = recoverable and self._in_pipeline
+        try:
+            if len(self._prepared) >= self._MAX_PREPARED:
+                _, oldest = self._prepared.popitem(last=False)
+                self.cursor.execute(f"DEALLOCATE {oldest}")
+            if savepoint:
+                self.cursor.execute("SAVEPOINT prepare")
+            self.cursor.execute(f"PREPARE {name} AS {query}")
+            if savepoint:
+                self.cursor.execute("RELEASE SAVEPOINT prepare")
+        except Error:
+            if savepoint:
+                try:
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT prepare")
+                except Error:
+                    self._pipeline_failed = True
+            else:
+                self._rollback()
+            raise
+        self._prepared[key] = name
+
+    def _execute_statement(self, key: Tuple, n_params: int) -> str:
+        """
+        生成执行预备语句的SQL, 并把该语句标记为最近使用
+
+        Args:
+            key: 预备语句缓存键
+            n_params: 参数个数
+
+        Returns:
+            EXECUTE语句, 参数占位符为 %s
+        """
+        self._prepared.move_to_end(key)
+        name = self._prepared[key]
+        if not n_params:
+            return f"EXECUTE {name}"
+        return f"EXECUTE {name} ({', '.join(['%s'] * n_params)})"
+
+    def _execute_prepared(self, key: Tuple, values: Tuple) -> bool:
+        """
+        执行已创建的预备语句
+
+        Args:
+            key: 预备语句缓存键
+            values: 语句参数
+
+        Returns:
+            执行是否成功
+        """
+        return self.execute_query(self._execute_statement(key, len(values)), values)
+
+    def _fetch_prepared(self, query: str, params: Tuple = ()) -> Optional[List[Tuple]]:
+        """
+        以预备语句执行SELECT, 按SQL文本缓存, 同样的查询服务端只解析和规划一次
+
+        Args:
+            query: SQL查询语句, 参数占位符为 %s
+            params: 查询参数
+
+        Returns:
+            查询结果列表
+        """
+        key = ("query", query)
+        if key not in self._prepared:
+            try:
+                self._prepare(key, _to_positional(query), recoverable=True)
+            except Error as e:
+                logger.warning(f"创建预备语句失败, 改用普通语句: {e}")
+                return self.fetch_query(query, params)
+        return self.fetch_query(self._execute_statement(key, len(params)), params)
+
     def fetch_query(
-        self, query: str, params: Optional[Tuple] = None
+        self,
+        query: Union[str, sql.Composable],
+        params: Optional[Tuple] = None,
+        numeric_as_float: bool = False,
     ) -> Optional[List[Tuple]]:
         """
         执行数据库查询（用于SELECT）
@@ -101,11 +494,18 @@ class PostgreSQL:
         Args:
             query: SQL查询语句
             params: 查询参数
+            numeric_as_float: NUMERIC列解析为float而不是Decimal
 
         Returns:
             查询结果列表
         """
         try:
+            if numeric_as_float:
+                with self.connection.cursor() as cursor:
+                    register_type(_NUMERIC_AS_FLOAT, cursor)
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+
             if params:
                 self.cursor.execute(query, params)
             else:
@@ -113,6 +513,8 @@ class PostgreSQL:
             results = self.cursor.fetchall()
             return results
         except Error as e:
+            # 查询出错后事务处于中止状态, pipeline() 块内据此整体回滚
+            self._rollback()
             logger.error(f"执行查询失败: {e}")
             return None
 
@@ -128,28 +530,37 @@ class PostgreSQL:
             插入是否成功
         """
         try:
-            columns = data.keys()
-            values = [data[col] for col in columns]
+            columns = tuple(data)
+            values = tuple(data.values())
 
-            placeholders = ", ".join(["%s"] * len(columns))
-            query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-                sql.Identifier(table),
-                sql.SQL(", ").join(map(sql.Identifier, columns)),
-                sql.SQL(placeholders),
-            )
+            key = ("insert", table, columns)
+            if key not in self._prepared:
+                query = self._compile_insert(
+                    table, columns, f"({_positional_placeholders(len(columns))})"
+                )
+                self._prepare(key, query.as_string(self.connection))
 
-            return self.execute_query(query.as_string(self.connection), tuple(values))
+            return self._execute_prepared(key, values)
         except Error as e:
             logger.error(f"插入数据失败: {e}")
             return False
 
-    def insert_many(self, table: str, data_list: List[Dict[str, Any]]) -> bool:
+    def insert_many(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        page_size: int = 1000,
+        copy_threshold: int = _COPY_THRESHOLD,
+    ) -> bool:
         """
         批量插入数据
 
         Args:
             table: 表名
             data_list: 数据字典列表
+            page_size: 每条INSERT语句包含的行数, PostgreSQL在1000到10000行时吞吐最高,
+                过大的语句反而变慢; 改用COPY导入时不使用
+            copy_threshold: 行数达到该值时改用COPY导入, 不再分页执行INSERT
 
         Returns:
             插入是否成功
@@ -157,28 +568,152 @@ class PostgreSQL:
         if not data_list:
             return False
 
-        try:
-            columns = data_list[0].keys()
-            placeholders = ", ".join(["%s"] * len(columns))
+        columns = tuple(data_list[0])
+        # itemgetter在C层按列取值, 单列时返回标量需要包成元组
+        getter = itemgetter(*columns)
+        if len(columns) == 1:
+            rows = ((getter(data),) for data in data_list)
+        else:
+            rows = map(getter, data_list)
 
-            query = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
-                sql.Identifier(table),
-                sql.SQL(", ").join(map(sql.Identifier, columns)),
-                sql.SQL(placeholders),
-            )
+        if len(data_list) >= copy_threshold:
+            return self.copy_from_iterable(table, columns, rows)
 
-            for data in data_list:
-                values = [data[col] for col in columns]
-                self.cursor.execute(query.as_string(self.connection), tuple(values))
+        try:
+            query = self._compile_insert(table, columns, "%s")
 
-            self.connection.commit()
+            # 多行合并为一条 INSERT ... VALUES (...), (...) 语句, 每页一次往返,
+            # rows按页惰性取出, 不会拼出一条包含全部数据的超长语句
+            execute_values(self.cursor, query, rows, page_size=page_size)
+
+            self._commit()
             logger.info(f"批量插入成功: {len(data_list)} 条数据")
             return True
         except Error as e:
-            self.connection.rollback()
+            self._rollback()
             logger.error(f"批量插入失败: {e}")
             return False
 
+    def copy_from_iterable(
+        self,
+        table: str,
+        columns: List[str],
+        rows: Iterable[Tuple],
+        sep: str = "\t",
+    ) -> bool:
+        """
+        通过 COPY FROM STDIN 批量导入数据, 行数据边生成边发送
+
+        Args:
+            table: 表名
+            columns: 列名列表
+            rows: 行数据, 每行是与columns对应的元组, None写入为NULL, 列表写入为数组,
+                bytes写入为bytea, Json和dict写入为JSON文本
+            sep: 列分隔符
+
+        Returns:
+            导入是否成功
+        """
+        escapes = {ord(sep): "\\" + sep, **_COPY_ESCAPES}
+
+        def format_value(value: Any) -> str:
+            if value is None:
+                return "\\N"
+            return _copy_text(value).translate(escapes)
+
+        lines = (sep.join(map(format_value, row)) + "\n" for row in rows)
+
+        try:
+            query = sql.SQL(
+                "COPY {} ({}) FROM STDIN WITH (FORMAT text, DELIMITER {})"
+            ).format(
+                _table_identifier(table),
+                sql.SQL(", ").join(map(sql.Identifier, columns)),
+                sql.Literal(sep),
+            )
+            self.cursor.copy_expert(query, _CopyStream(lines))
+            self._commit()
+            logger.info(f"COPY导入成功: {self.cursor.rowcount} 条数据")
+            return True
+        except Error as e:
+            self._rollback()
+            logger.error(f"COPY导入失败: {e}")
+            return False
+
+    def load_csv(
+        self,
+        path: Union[str, Path],
+        table: str,
+        header_lines: int = 2,
+        encoding: str = "gbk",
+    ) -> bool:
+        """
+        把CSV文件通过 COPY FROM STDIN 导入到表中, 文件原样发送, 由服务端解析
+
+        Args:
+            path: CSV文件路径
+            table: 表名
+            header_lines: 跳过文件开头的行数, xbx文件第一行为广子, 第二行为表头
+            encoding: 文件编码
+
+        Returns:
+            导入是否成功
+        """
+        try:
+            query = sql.SQL("COPY {} FROM STDIN WITH (FORMAT csv, ENCODING {})").format(
+                _table_identifier(table), sql.Literal(encoding)
+            )
+            with open(path, "rb") as f:
+                for _ in range(header_lines):
+                    f.readline()
+                self.cursor.copy_expert(query, f)
+            self._commit()
+            logger.info(f"成功导入 {path} 到表 {table}, 共 {self.cursor.rowcount} 行")
+            return True
+        except (Error, OSError) as e:
+            self._rollback()
+            logger.error(f"导入 {path} 到表 {table} 失败: {e}")
+            return False
+
+    @staticmethod
+    def _compose_select(
+        table: str,
+        columns: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> sql.Composed:
+        """
+        构造SELECT语句, 表名和列名按标识符转义
+
+        Args:
+            table: 表名
+            columns: 列名列表（默认为*）
+            where: WHERE子句（不含WHERE关键字）
+            order_by: 排序子句（不含ORDER BY关键字）
+            limit: 限制返回行数
+
+        Returns:
+            SELECT语句
+        """
+        col_sql = (
+            sql.SQL(", ").join(map(sql.Identifier, columns))
+            if columns
+            else sql.SQL("*")
+        )
+        query = sql.SQL("SELECT {} FROM {}").format(col_sql, _table_identifier(table))
+
+        if where:
+            query += sql.SQL(" WHERE ") + sql.SQL(where)
+
+        if order_by:
+            query += sql.SQL(" ORDER BY ") + sql.SQL(order_by)
+
+        if limit:
+            query += sql.SQL(" LIMIT {}").format(sql.Literal(int(limit)))
+
+        return query
+
     def read_data(
         self,
         table: str,
@@ -203,17 +738,7 @@ class PostgreSQL:
             查询结果列表
         """
         try:
-            col_str = ", ".join(columns) if columns else "*"
-            query = f"SELECT {col_str} FROM {table}"
-
-            if where:
-                query += f" WHERE {where}"
-
-            if order_by:
-                query += f" ORDER BY {order_by}"
-
-            if limit:
-                query += f" LIMIT {limit}"
+            query = self._compose_select(table, columns, where, order_by, limit)
 
             return self.fetch_query(query, params)
         except Error as e:
@@ -228,10 +753,14 @@ class PostgreSQL:
         params: Optional[Tuple] = None,
         limit: Optional[int] = None,
         order_by: Optional[str] = None,
+        chunk_size: int = 10000,
+        numeric_as_float: bool = False,
     ) -> Optional[pd.DataFrame]:
         """
         读取表中的数据为DataFrame
 
+        使用服务端游标分批拉取, 客户端每次只接收chunk_size行
+
         Args:
             table: 表名
             columns: 列名列表
@@ -239,28 +768,172 @@ class PostgreSQL:
             params: WHERE子句参数
             limit: 限制返回行数
             order_by: 排序子句
+            chunk_size: 每批拉取的行数
+            numeric_as_float: NUMERIC列解析为float, DataFrame中得到float64列而不是Decimal对象列
+
+        Returns:
+            Pandas DataFrame或None
+        """
+        query = self._compose_select(table, columns, where, order_by, limit)
+        return self.query_dataframe(query, params, chunk_size, numeric_as_float)
+
+    def query_dataframe(
+        self,
+        query: Union[str, sql.Composable],
+        params: Optional[Tuple] = None,
+        chunk_size: int = 10000,
+        numeric_as_float: bool = False,
+    ) -> Optional[pd.DataFrame]:
+        """
+        执行任意SELECT语句并返回DataFrame, 使用服务端游标分批拉取
+
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            chunk_size: 每批拉取的行数
+            numeric_as_float: NUMERIC列解析为float
 
         Returns:
             Pandas DataFrame或None
         """
         try:
-            col_str = ", ".join(columns) if columns else "*"
-            query = f"SELECT {col_str} FROM {table}"
+            chunks = []
+            with self.connection.cursor(name=f"stream_{uuid4().hex}") as cursor:
+                cursor.itersize = chunk_size
+                if numeric_as_float:
+                    register_type(_NUMERIC_AS_FLOAT, cursor)
+                cursor.execute(query, params)
+                while rows := cursor.fetchmany(chunk_size):
+                    chunks.append(rows)
+                names = [desc.name for desc in cursor.description]
+
+            # 与 pd.read_sql 一致, Decimal转换为float64
+            return pd.DataFrame.from_records(
+                chain.from_iterable(chunks), columns=names, coerce_float=True
+            )
+        except Error as e:
+            # 服务端游标出错后事务处于中止状态, 回滚后连接才能继续使用
+            self._rollback()
+            logger.error(f"读取DataFrame失败: {e}")
+            return None
 
-            if where:
-                query += f" WHERE {where}"
+    def read_dataframe_fast(
+        self,
+        query: Union[str, sql.Composable],
+        params: Optional[Tuple] = None,
+        partition_on: Optional[str] = None,
+        partition_num: int = 4,
+    ) -> Optional[pd.DataFrame]:
+        """
+        用connectorx读取查询结果为DataFrame, 数据直接解码为列式内存, 不经过逐行的Python对象
 
-            if order_by:
-                query += f" ORDER BY {order_by}"
+        未安装connectorx时退回 query_dataframe
 
-            if limit:
-                query += f" LIMIT {limit}"
+        Args:
+            query: SQL查询语句
+            params: 查询参数, 在客户端按psycopg2规则转义后拼入语句
+            partition_on: 按该数值列切分查询, 用多个连接并行读取
+            partition_num: 切分的份数
 
-            return pd.read_sql(query, self.connection, params=params)
-        except Error as e:
+        Returns:
+            Pandas DataFrame或None
+        """
+        try:
+            import connectorx as cx
+        except ImportError:
+            logger.warning("未安装connectorx, 改用服务端游标读取")
+            return self.query_dataframe(query, params)
+
+        try:
+            query = self.cursor.mogrify(query, params).decode(
+                encodings[self.connection.encoding]
+            )
+            partition = (
+                {"partition_on": partition_on, "partition_num": partition_num}
+                if partition_on
+                else {}
+            )
+            return cx.read_sql(self.dsn, query, return_type="pandas", **partition)
+        except (Error, RuntimeError) as e:
             logger.error(f"读取DataFrame失败: {e}")
             return None
 
+    def export_query_to_parquet(
+        self,
+        query: Union[str, sql.Composable],
+        path: Union[str, Path],
+        params: Optional[Tuple] = None,
+        batch_size: int = 100000,
+    ) -> bool:
+        """
+        把查询结果直接写入Parquet文件, 按批从服务端游标拉取并逐批写出, 不经过DataFrame
+
+        内存占用只与batch_size有关, NUMERIC列导出为float64, 未识别的类型导出为字符串
+
+        Args:
+            query: SQL查询语句
+            path: Parquet文件路径
+            params: 查询参数
+            batch_size: 每批拉取和写出的行数
+
+        Returns:
+            导出是否成功
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("导出Parquet需要安装pyarrow")
+            return False
+
+        writer = None
+        total = 0
+        try:
+            with self.connection.cursor(name=f"stream_{uuid4().hex}") as cursor:
+                cursor.itersize = batch_size
+                register_type(_NUMERIC_AS_FLOAT, cursor)
+                # JSON保持服务端返回的原文
+                register_default_json(cursor, loads=str)
+                register_default_jsonb(cursor, loads=str)
+                cursor.execute(query, params)
+                rows = cursor.fetchmany(batch_size)
+
+                # 服务端游标第一次取数后才有列信息
+                known = [desc.type_code in _ARROW_TYPES for desc in cursor.description]
+                fields = []
+                for desc in cursor.description:
+                    name, *args = _ARROW_TYPES.get(desc.type_code, ("string",))
+                    fields.append((desc.name, getattr(pa, name)(*args)))
+                schema = pa.schema(fields)
+                writer = pq.ParquetWriter(str(path), schema, compression="zstd")
+
+                while rows:
+                    columns = [
+                        col if ok else [None if v is None else str(v) for v in col]
+                        for col, ok in zip(zip(*rows), known)
+                    ]
+                    writer.write_batch(
+                        pa.RecordBatch.from_arrays(
+                            [
+                                pa.array(col, type=field.type)
+                                for col, field in zip(columns, schema)
+                            ],
+                            schema=schema,
+                        )
+                    )
+                    total += len(rows)
+                    rows = cursor.fetchmany(batch_size)
+
+            logger.info(f"成功导出 {total} 行到 {path}")
+            return True
+        except (Error, pa.ArrowException, OSError) as e:
+            self._rollback()
+            logger.error(f"导出Parquet到 {path} 失败: {e}")
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+
     def update_data(
         self,
         table: str,
@@ -271,6 +944,9 @@ class PostgreSQL:
         """
         更新表中的数据
 
+        WHERE参数都是单个值时按预备语句执行, 同样的语句服务端只解析一次; 含元组等需要
+        客户端展开的参数(如 IN %s)或命名参数时按普通语句执行
+
         Args:
             table: 表名
             data: 要更新的数据字典 {列名: 新值}
@@ -281,33 +957,122 @@ class PostgreSQL:
             更新是否成功
         """
         try:
-            set_clause = ", ".join([f"{col} = %s" for col in data.keys()])
-            query = f"UPDATE {table} SET {set_clause} WHERE {where}"
-
-            values = list(data.values())
-            if params:
-                values.extend(params)
-
-            return self.execute_query(query, tuple(values))
+            columns = tuple(data)
+            values = (*data.values(), *(params or ()))
+            key = (
+                self._prepare_update(table, columns, where)
+                if _scalar_params(where, params)
+                else None
+            )
+            if key:
+                return self._execute_prepared(key, values)
+            return self.execute_query(
+                self._compile_update(table, columns, where, prepared=False), values
+            )
         except Error as e:
             logger.error(f"更新数据失败: {e}")
             return False
 
+    def _prepare_update(
+        self, table: str, columns: Tuple[str, ...], where: str
+    ) -> Optional[Tuple]:
+        """
+        为 UPDATE table SET columns WHERE where 创建(或复用)预备语句
+
+        Args:
+            table: 表名
+            columns: 要更新的列名
+            where: WHERE子句, 使用 %s 占位符
+
+        Returns:
+            预备语句缓存键, 语句无法预备时为None, 调用方改用普通语句执行
+        """
+        key = ("update", table, columns, where)
+        if key not in self._prepared:
+            query = self._compile_update(table, columns, where)
+            try:
+                self._prepare(key, query.as_string(self.connection), recoverable=True)
+            except Error as e:
+                logger.warning(f"创建预备语句失败, 改用普通语句: {e}")
+                return None
+        return key
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_insert(
+        table: str, columns: Tuple[str, ...], values: str
+    ) -> sql.Composed:
+        """
+        构造INSERT语句, 相同的表、列和占位符只构造一次
+
+        Args:
+            table: 表名
+            columns: 列名
+            values: VALUES之后的部分, 如 execute_values 用的 "%s" 或预备语句的 "($1, $2)"
+
+        Returns:
+            INSERT语句
+        """
+        return sql.SQL("INSERT INTO {} ({}) VALUES {}").format(
+            _table_identifier(table),
+            sql.SQL(", ").join(map(sql.Identifier, columns)),
+            sql.SQL(values),
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_update(
+        table: str, columns: Tuple[str, ...], where: str, prepared: bool = True
+    ) -> sql.Composed:
+        """
+        构造UPDATE语句, 相同的表、列和WHERE子句只构造一次
+
+        Args:
+            table: 表名
+            columns: 要更新的列名, 预备语句中依次对应 $1, $2, ...
+            where: WHERE子句, 预备语句中其 %s 占位符接着编号
+            prepared: 为False时保留 %s 占位符, 由psycopg2在客户端填入参数
+
+        Returns:
+            UPDATE语句
+        """
+        if not prepared:
+            set_clause = sql.SQL(", ").join(
+                sql.SQL("{} = %s").format(sql.Identifier(col)) for col in columns
+            )
+            return sql.SQL("UPDATE {} SET {} WHERE {}").format(
+                _table_identifier(table), set_clause, sql.SQL(where)
+            )
+
+        set_clause = sql.SQL(", ").join(
+            sql.SQL("{} = ${}").format(sql.Identifier(col), sql.SQL(str(i)))
+            for i, col in enumerate(columns, start=1)
+        )
+        where_clause = _to_positional(where, start=len(columns) + 1)
+        return sql.SQL("UPDATE {} SET {} WHERE {}").format(
+            _table_identifier(table), set_clause, sql.SQL(where_clause)
+        )
+
     def update_many(
         self,
         table: str,
         data_list: List[Dict[str, Any]],
         where: str,
         params_list: List[Tuple],
+        key_columns: Optional[List[str]] = None,
     ) -> bool:
         """
         批量更新数据
 
         Args:
             table: 表名
-            data_list: 要更新的数据字典列表
-            where: WHERE子句
-            params_list: WHERE子句参数列表
+            data_list: 要更新的数据字典列表, 各行可以更新不同的列; 指定key_columns时
+                每行的列必须相同
+            where: WHERE子句, 指定key_columns时不使用; 参数都是单个值时按预备语句执行,
+                含元组等需要客户端展开的参数(如 IN %s)时按普通语句执行
+            params_list: WHERE子句参数列表, 指定key_columns时为与其顺序对应的键值
+            key_columns: 定位行的键列名列表; 指定后所有数据合并为一条
+                UPDATE ... FROM (VALUES ...) 语句, 否则按预备语句分批执行
 
         Returns:
             更新是否成功
@@ -315,15 +1080,147 @@ class PostgreSQL:
         if not data_list or len(data_list) != len(params_list):
             return False
 
+        if key_columns:
+            columns = set(data_list[0])
+            if any(set(data) != columns for data in data_list):
+                logger.error("批量更新失败: 指定key_columns时每行更新的列必须相同")
+                return False
+            return self._update_from_values(table, data_list, params_list, key_columns)
+
+        try:
+            scalar = all(_scalar_params(where, params) for params in params_list)
+
+            # 相邻且更新列相同的行合并为一批, 各行仍按原顺序执行
+            for columns, group in groupby(
+                zip(data_list, params_list), key=lambda item: tuple(item[0])
+            ):
+                rows = [
+                    tuple(data.values()) + tuple(params or ()) for data, params in group
+                ]
+                key = self._prepare_update(table, columns, where) if scalar else None
+
+                # 多条语句拼成一批发送, 每页一次往返, 执行后cursor.rowcount只反映最后一页
+                query = (
+                    self._execute_statement(key, len(rows[0]))
+                    if key
+                    else self._compile_update(table, columns, where, prepared=False)
+                )
+                execute_batch(self.cursor, query, rows, page_size=500)
+            self._commit()
+            logger.info(f"批量更新成功: {len(data_list)} 条数据")
+            return True
+        except Error as e:
+            self._rollback()
+            logger.error(f"批量更新失败: {e}")
+            return False
+
+    def _update_from_values(
+        self,
+        table: str,
+        data_list: List[Dict[str, Any]],
+        params_list: List[Tuple],
+        key_columns: List[str],
+    ) -> bool:
+        """
+        用一条 UPDATE t SET c = v.c FROM (VALUES ...) AS v WHERE t.k = v.k 完成批量更新
+
+        Args:
+            table: 表名
+            data_list: 要更新的数据字典列表
+            params_list: 与key_columns顺序对应的键值列表
+            key_columns: 键列名列表
+
+        Returns:
+            更新是否成功
+        """
         try:
-            for data, params in zip(data_list, params_list):
-                self.update_data(table, data, where, params)
+            columns = list(data_list[0].keys())
+            value_columns = list(key_columns) + columns
+            column_types = self._column_types(table)
+            if not set(value_columns) <= column_types.keys():
+                # 缓存的列类型可能早于表结构变更, 重新查询一次再判断
+                self._column_type_cache.pop(table, None)
+                column_types = self._column_types(table)
+            missing = [col for col in value_columns if col not in column_types]
+            if missing:
+                logger.error(f"批量更新失败: 表 {table} 中没有列 {missing}")
+                return False
+
+            query = sql.SQL(
+                "UPDATE {} AS t SET {} FROM (VALUES %s) AS v ({}) WHERE {}"
+            ).format(
+                _table_identifier(table),
+                sql.SQL(", ").join(
+                    sql.SQL("{0} = v.{0}").format(sql.Identifier(col))
+                    for col in columns
+                ),
+                sql.SQL(", ").join(map(sql.Identifier, value_columns)),
+                sql.SQL(" AND ").join(
+                    sql.SQL("t.{0} = v.{0}").format(sql.Identifier(col))
+                    for col in key_columns
+                ),
+            )
+            # VALUES中的字符串字面量默认推断为text, 按列类型显式转换
+            template = sql.SQL("({})").format(
+                sql.SQL(", ").join(
+                    sql.SQL("%s::" + column_types[col]) for col in value_columns
+                )
+            )
+
+            getter = itemgetter(*columns)
+            if len(columns) == 1:
+                rows = (
+                    tuple(params) + (getter(data),)
+                    for data, params in zip(data_list, params_list)
+                )
+            else:
+                rows = (
+                    tuple(params) + getter(data)
+                    for data, params in zip(data_list, params_list)
+                )
+
+            execute_values(
+                self.cursor,
+                query,
+                rows,
+                template=template.as_string(self.connection),
+                page_size=1000,
+            )
+            self._commit()
             logger.info(f"批量更新成功: {len(data_list)} 条数据")
             return True
         except Error as e:
+            self._rollback()
             logger.error(f"批量更新失败: {e}")
             return False
 
+    def _column_types(self, table: str) -> Dict[str, str]:
+        """
+        查询并缓存表的列类型
+
+        类型名不带长度等修饰, 显式转换为 varchar(n)/char(n) 会静默截断超长的值,
+        转换为基础类型后由赋值给列时检查长度, 超长时报错
+
+        Args:
+            table: 表名
+
+        Returns:
+            {列名: 列类型}, 如 {'id': 'pg_catalog.int4', 'name': 'pg_catalog.varchar'}
+        """
+        if table not in self._column_type_cache:
+            query = """
+                SELECT a.attname, format('%%I.%%I', n.nspname, t.typname)
+                FROM pg_attribute a
+                JOIN pg_type t ON t.oid = a.atttypid
+                JOIN pg_namespace n ON n.oid = t.typnamespace
+                WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+            """
+            self.cursor.execute(
+                query, (_table_identifier(table).as_string(self.connection),)
+            )
+            self._column_type_cache[table] = dict(self.cursor.fetchall())
+        return self._column_type_cache[table]
+
     def delete_data(
         self, table: str, where: Optional[str] = None, params: Optional[Tuple] = None
     ) -> bool:
@@ -339,10 +1236,10 @@ class PostgreSQL:
             删除是否成功
         """
         try:
-            query = f"DELETE FROM {table}"
+            query = sql.SQL("DELETE FROM {}").format(_table_identifier(table))
 
             if where:
-                query += f" WHERE {where}"
+                query += sql.SQL(" WHERE ") + sql.SQL(where)
             else:
                 logger.warning(f"删除整个表 {table} 的所有数据")
 
@@ -382,7 +1279,7 @@ class PostgreSQL:
                 WHERE table_name = %s
             )
         """
-        result = self.fetch_query(query, (table,))
+        result = self._fetch_prepared(query, (table,))
         return result[0][0] if result else False
 
     def get_row_count(
@@ -400,12 +1297,14 @@ class PostgreSQL:
             行数
         """
         try:
-            query = f"SELECT COUNT(*) FROM {table}"
+            query = sql.SQL("SELECT COUNT(*) FROM {}").format(_table_identifier(table))
 
+            # 调用方的WHERE子句可能含需要客户端展开的参数(如 IN %s), 不做预备
             if where:
-                query += f" WHERE {where}"
-
-            result = self.fetch_query(query, params)
+                query += sql.SQL(" WHERE ") + sql.SQL(where)
+                result = self.fetch_query(query, params)
+            else:
+                result = self._fetch_prepared(query.as_string(self.connection))
             return result[0][0] if result else 0
         except Error as e:
             logger.error(f"获取行数失败: {e}")
@@ -427,7 +1326,7 @@ class PostgreSQL:
                 WHERE table_name = %s
                 ORDER BY ordinal_position
             """
-            results = self.fetch_query(query, (table,))
+            results = self._fetch_prepared(query, (table,))
             return [col[0] for col in results] if results else None
         except Error as e:
             logger.error(f"获取列名失败: {e}")
@@ -446,8 +1345,13 @@ class PostgreSQL:
             创建是否成功
         """
         try:
-            columns_def = ", ".join([f"{col} {dtype}" for col, dtype in schema.items()])
-            query = f"CREATE TABLE IF NOT EXISTS {table} ({columns_def})"
+            columns_def = sql.SQL(", ").join(
+                sql.SQL("{} {}").format(sql.Identifier(col), sql.SQL(dtype))
+                for col, dtype in schema.items()
+            )
+            query = sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(
+                _table_identifier(table), columns_def
+            )
             return self.execute_query(query)
         except Error as e:
             logger.error(f"创建表失败: {e}")
@@ -465,8 +1369,11 @@ class PostgreSQL:
             删除是否成功
         """
         try:
-            exists_clause = "IF EXISTS" if if_exists else ""
-            query = f"DROP TABLE {exists_clause} {table}"
+            exists_clause = sql.SQL("IF EXISTS ") if if_exists else sql.SQL("")
+            query = sql.SQL("DROP TABLE {}{}").format(
+                exists_clause, _table_identifier(table)
+            )
+            self._column_type_cache.pop(table, None)
             return self.execute_query(query)
         except Error as e:
             logger.error(f"删除表失败: {e}")
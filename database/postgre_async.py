@@ -0,0 +1,201 @@
+"""PostgreSQL异步数据库操作模块 (asyncpg)"""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import asyncpg
+from loguru import logger
+
+
+class AsyncPostgreSQL:
+    """
+    PostgreSQL异步操作类
+
+    基于asyncpg连接池, 使用二进制COPY协议批量导入, 多个文件可在同一事件循环中并发导入
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 5432,
+        database: str = "A",
+        user: str = "postgres",
+        password: str = "123456",
+        min_size: int = 2,
+        max_size: int = 16,
+    ):
+        """
+        初始化PostgreSQL异步连接池参数
+
+        Args:
+            host: 主机地址
+            port: 端口号
+            database: 数据库名
+            user: 用户名
+            password: 密码
+            min_size: 连接池最少连接数
+            max_size: 连接池最多连接数, 即最大并发导入数
+        """
+        self.host = host
+        self.port = port
+        self.database = database
+        self.user = user
+        self.password = password
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool: Optional[asyncpg.Pool] = None
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError("连接PostgreSQL失败")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.disconnect()
+
+    async def connect(self) -> bool:
+        """
+        创建连接池
+
+        Returns:
+            连接是否成功
+        """
+        try:
+            self.pool = await asyncpg.create_pool(
+                host=self.host,
+                port=self.port,
+                database=self.database,
+                user=self.user,
+                password=self.password,
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+            logger.info(
+                f"成功连接到PostgreSQL: {self.user}@{self.host}:{self.port}/{self.database}"
+            )
+            return True
+        except (asyncpg.PostgresError, OSError) as e:
+            logger.error(f"连接PostgreSQL失败: {e}")
+            return False
+
+    async def disconnect(self) -> None:
+        """关闭连接池"""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+            logger.info("数据库连接池已关闭")
+
+    async def fetch_query(
+        self, query: str, *args: Any
+    ) -> Optional[List[asyncpg.Record]]:
+        """
+        执行数据库查询（用于SELECT）
+
+        Args:
+            query: SQL查询语句, 参数占位符为 $1, $2, ...
+            args: 查询参数
+
+        Returns:
+            查询结果列表
+        """
+        try:
+            async with self.pool.acquire() as connection:
+                return await connection.fetch(query, *args)
+        except asyncpg.PostgresError as e:
+            logger.error(f"执行查询失败: {e}")
+            return None
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: Sequence[str],
+        records: Iterable[Tuple],
+    ) -> bool:
+        """
+        通过二进制COPY协议批量导入数据
+
+        Args:
+            table: 表名
+            columns: 列名列表
+            records: 行数据, 每行是与columns对应的元组
+
+        Returns:
+            导入是否成功
+        """
+        try:
+            async with self.pool.acquire() as connection:
+                status = await connection.copy_records_to_table(
+                    table, records=records, columns=list(columns)
+                )
+            logger.info(f"COPY导入到表 {table} 成功: {status}")
+            return True
+        except asyncpg.PostgresError as e:
+            logger.error(f"COPY导入到表 {table} 失败: {e}")
+            return False
+
+    async def copy_csv(
+        self,
+        table: str,
+        path: Path,
+        columns: Optional[Sequence[str]] = None,
+        header_lines: int = 1,
+        encoding: str = "utf8",
+    ) -> bool:
+        """
+        把CSV文件通过COPY导入到表中, 文件内容由服务端解析
+
+        Args:
+            table: 表名
+            path: CSV文件路径
+            columns: 列名列表(默认为表的全部列)
+            header_lines: 跳过文件开头的行数(表头等)
+            encoding: 文件编码, 如 'gbk'
+
+        Returns:
+            导入是否成功
+        """
+        try:
+            # 先取得连接再打开文件, 并发导入时同时打开的文件数不超过连接池大小
+            async with self.pool.acquire() as connection:
+                with open(path, "rb") as f:
+                    for _ in range(header_lines):
+                        f.readline()
+                    status = await connection.copy_to_table(
+                        table,
+                        source=f,
+                        columns=list(columns) if columns else None,
+                        format="csv",
+                        encoding=encoding,
+                    )
+            logger.info(f"成功导入 {path} 到表 {table}: {status}")
+            return True
+        except (asyncpg.PostgresError, OSError) as e:
+            logger.error(f"导入 {path} 到表 {table} 失败: {e}")
+            return False
+
+    async def ingest_csv_files(
+        self,
+        csv_files: Iterable[Path],
+        header_lines: int = 2,
+        encoding: str = "gbk",
+    ) -> List[bool]:
+        """
+        并发导入多个CSV文件, 每个文件导入到与文件名(不含扩展名)同名的表
+
+        Args:
+            csv_files: CSV文件路径列表
+            header_lines: 每个文件跳过的开头行数, xbx文件第一行为广子, 第二行为表头
+            encoding: 文件编码
+
+        Returns:
+            每个文件是否导入成功
+        """
+        return await asyncio.gather(
+            *(
+                self.copy_csv(
+                    Path(p).stem, p, header_lines=header_lines, encoding=encoding
+                )
+                for p in csv_files
+            )
+        )
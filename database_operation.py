@@ -1,24 +1,48 @@
 from database.mysql import MYSQL
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+from concurrent.futures import ProcessPoolExecutor
+import os
 
+if TYPE_CHECKING:
+    # 只用于类型标注, MySQL导入流程和子进程不必安装psycopg2
+    from database.postgre import PostgreSQL
 
-def ingest_data_from_csv(csv_path:Path) -> None:
-    # 数据库连接
-    mysql = MYSQL()
-    # 获取数据
-    csv_path :str = str(csv_path)
-    table_name :str = csv_path.split('\\')[-1].split('.')[0]
+# 子进程内的数据库连接, 由进程池的initializer创建, 进程退出时随之断开
+_worker_mysql: MYSQL = None
+
+
+def ingest_data_from_csv(mysql: MYSQL, csv_path:Path) -> None:
+    # 获取数据, 表名取文件名(不含扩展名), 与操作系统的路径分隔符无关
+    table_name :str = csv_path.stem
     # 数据入库
     # 中文编码需要指定为gbk， 默认为utf-8
     # 忽略csv文件前两行，xbx文件第一行为广子，第二行为表头
-    mysql.load_data_local_infile(csv_path=csv_path, table_name=table_name, ignore_lines=2, decoder='gbk')
+    mysql.load_data_local_infile(csv_path=str(csv_path), table_name=table_name, ignore_lines=2, decoder='gbk')
+
+
+def ingest_all_to_postgres(csv_files: Iterable[Path], db: "PostgreSQL") -> None:
+    # 所有文件共用db的一个连接, 逐个通过COPY导入到与文件名同名的表
+    # 用法: with PostgreSQL(...) as db: ingest_all_to_postgres(csv_files, db)
+    for csv_path in csv_files:
+        db.load_csv(csv_path, csv_path.stem, header_lines=2, encoding='gbk')
+
+
+def _init_worker() -> None:
+    # 每个子进程只建立一次连接, 之后处理的所有文件共用
+    global _worker_mysql
+    _worker_mysql = MYSQL()
+
+
+def _ingest_in_worker(csv_path:Path) -> None:
+    ingest_data_from_csv(_worker_mysql, csv_path)
 
 
 # 遍历文件夹中的csv文件
 if __name__ == '__main__':
     # 获取文件夹中的所有csv文件
     csv_files = list(Path(r'test_data\stock-trading-data-2024-09-28N').glob('*.csv'))
-    # 遍历csv文件
-    for csv_file in csv_files:
-        # 数据入库
-        ingest_data_from_csv(csv_path=csv_file)
+    # 每个csv对应一张独立的表, 多进程并行导入
+    max_workers = min(os.cpu_count() or 1, 8)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+        list(pool.map(_ingest_in_worker, csv_files))